@@ -1,174 +1,336 @@
-import pandas as pd
+import csv
+import io
+import mmap
+import os
 import re  # 正则表达式模块
-import openpyxl
-from openpyxl.styles import Alignment
-from openpyxl.utils import get_column_letter
+import sys
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape
+
+# Excel列顺序
+COLUMNS = ['题型', '等级', '题号', '题目编号', '题目内容',
+           '选项A', '选项B', '选项C', '选项D',
+           '正确答案', '关联评价点', '工种', '工种定义']
+
+# 工种及工种定义，每题都相同，全部行共用同一个字符串对象
+GONGZHONG = sys.intern("变电设备检修工(开关)")
+GONGZHONG_DEF = sys.intern("从事电网变电站一次开关类设备验收、维护、检修的人员")
+
+# 题号中的题型代码、等级代码对应的名称
+_TYPE_LABELS = {
+    '1': sys.intern('单选题'),
+    '2': sys.intern('多选题'),
+    '3': sys.intern('判断题')
+}
+_LEVEL_LABELS = {
+    '1': sys.intern('初级工'), '2': sys.intern('中级工'), '3': sys.intern('高级工'),
+    '4': sys.intern('技师'), '5': sys.intern('高级技师')
+}
+
+# 题目块数达到该值且有多个CPU时才用多进程解析（进程启动和数据传输有固定开销，小题库反而更慢）
+PARALLEL_THRESHOLD = 20000
+
+# 列宽（与 COLUMNS 一一对应）
+COL_WIDTHS = [8, 10, 10, 8, 80, 30, 30, 30, 30, 8, 35, 15, 50]
+# 列字母，以及需要自动换行的列
+COL_LETTERS = 'ABCDEFGHIJKLM'
+WRAP_COLUMNS = 'EFGHIKM'
+
+# xlsx 固定部件：内容类型、关系、样式表
+# 样式编号：0 默认，1 表头（加粗、边框、居中），2 自动换行、顶端对齐
+_CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+_STYLES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2">'
+    '<font><sz val="11"/><name val="Calibri"/><family val="2"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/><family val="2"/></font>'
+    '</fonts>'
+    '<fills count="2">'
+    '<fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill>'
+    '</fills>'
+    '<borders count="2">'
+    '<border><left/><right/><top/><bottom/><diagonal/></border>'
+    '<border><left style="thin"><color auto="1"/></left><right style="thin"><color auto="1"/></right>'
+    '<top style="thin"><color auto="1"/></top><bottom style="thin"><color auto="1"/></bottom>'
+    '<diagonal/></border>'
+    '</borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="1" xfId="0" '
+    'applyFont="1" applyBorder="1" applyAlignment="1">'
+    '<alignment horizontal="center" vertical="top"/></xf>'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0" applyAlignment="1">'
+    '<alignment vertical="top" wrapText="1"/></xf>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+# 预编译正则表达式（避免在逐题循环中重复解析模式串）
+# 文本中的转义实体，一次扫描全部替换
+_ENTITIES = {'&#xA;': '\n', '&lt;': '<', '&gt;': '>'}
+_RE_ENTITY = re.compile(r'&#xA;|&lt;|&gt;')
+_RE_SPLIT = re.compile(r'\n(?=\d+\.\d+\.\d+\.\s+第\d+题)')
+_RE_QID = re.compile(r'(?P<qid>(?P<t>\d+)\.(?P<lv>\d+)\.\d+)\.\s+第(?P<n>\d+)题')
+_RE_CONTENT_END = re.compile(r'\n(?:[A-D]\.|正确答案)')
+# 题干中的"第x页"字样
+_RE_PAGE = re.compile(r'第\s*\d+\s*页\s*[:：]?')
+_RE_OPTS = re.compile(r'(?m)^([A-D])\.([^\n]*)')
+_RE_ANSWER = re.compile(r'正确答案[:：]\s*([A-D]+|[正确错误]+)')
+_RE_EVAL = re.compile(r'关联评价点的名称[:：]\s*(.+)')
+# XML 1.0 不允许出现的控制字符（PDF 导出文本里偶有换页符等）
+_RE_XML_ILLEGAL = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _entity_repl(match):
+    """转义实体替换为对应字符"""
+    return _ENTITIES[match.group(0)]
+
+
+def _xml_text(value):
+    """转义XML特殊字符，非法控制字符按 Excel 的 _xHHHH_ 形式保留"""
+    value = escape(value)
+    if _RE_XML_ILLEGAL.search(value):
+        value = _RE_XML_ILLEGAL.sub(lambda m: '_x%04X_' % ord(m.group(0)), value)
+    return value
+
+
+def read_text(path):
+    """以只读内存映射读取题库文本，直接从映射区解码（UTF-8失败时改用GBK）"""
+    with open(path, 'rb') as f:
+        # 空文件无法建立映射
+        if os.fstat(f.fileno()).st_size == 0:
+            return ''
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            try:
+                return str(mm, 'utf-8')
+            except UnicodeDecodeError:
+                print("错误：文件编码问题！尝试使用GBK编码...")
+                return str(mm, 'gbk')
+
+
+def _parse_block(block):
+    """解析单个题目块，返回按 COLUMNS 列顺序排列的元组；无效或非选择/判断题返回 None"""
+    # isspace 遇到第一个非空白字符即返回，不像 strip 那样复制整个块
+    if not block or block.isspace():
+        return None
+
+    # 提取题号
+    qid_match = _RE_QID.search(block)
+    if not qid_match:
+        return None
+
+    # 题号、题型代码、等级代码、题目编号都直接取自命名分组
+    full_qid, type_code, level_code, qnum = qid_match.group('qid', 't', 'lv', 'n')
+
+    # 提取题型和等级；_TYPE_LABELS 只收录选择题和判断题，查不到即跳过
+    q_type = _TYPE_LABELS.get(type_code)
+    if q_type is None:
+        return None
+
+    q_level = _LEVEL_LABELS.get(level_code, '未知等级')
+
+    # 提取题干
+    content_start = block.find('\n', qid_match.end()) + 1
+    # 直接从 content_start 开始搜索，避免先切出剩余部分的临时字符串
+    content_end = _RE_CONTENT_END.search(block, content_start)
+    if content_end:
+        content = block[content_start:content_end.start()].strip()
+    else:
+        content = block[content_start:].split('正确答案：')[0].strip()
+
+    # 清理题干内容：去除"第x页"字样及其变体（不含"第"字时不必扫描）
+    if '第' in content:
+        content = _RE_PAGE.sub('', content)
+    # 多余的空格和换行合并为一个空格，split/join 在C层完成，比正则替换快
+    content = ' '.join(content.split())
+
+    # 提取选项（仅选择题）
+    options = {}
+    if q_type != '判断题':
+        # 一次扫描取出所有行首选项，同一字母以首次出现为准
+        for opt_match in _RE_OPTS.finditer(block):
+            options.setdefault(opt_match.group(1), opt_match.group(2).strip())
+
+    # 提取答案
+    answer_match = _RE_ANSWER.search(block)
+    answer = answer_match.group(1) if answer_match else ""
+
+    # 提取评价点
+    eval_match = _RE_EVAL.search(block)
+    eval_point = eval_match.group(1).strip() if eval_match else ""
+
+    return (
+        q_type,
+        q_level,
+        full_qid,
+        int(qnum),
+        content,
+        options.get('A', ''),
+        options.get('B', ''),
+        options.get('C', ''),
+        options.get('D', ''),
+        answer,
+        eval_point,
+        GONGZHONG,
+        GONGZHONG_DEF
+    )
 
 
 def parse_questions(text):
     # 预处理文本
-    text = text.replace("&#xA;", "\n").replace("&lt;", "<").replace("&gt;", ">")
+    text = _RE_ENTITY.sub(_entity_repl, text)
 
     # 分割题目
-    question_blocks = re.split(r'\n(?=\d+\.\d+\.\d+\.\s+第\d+题)', text)
-    questions = []
-
-    for block in question_blocks:
-        if not block.strip():
-            continue
-
-        # 提取题号
-        qid_match = re.search(r'(\d+\.\d+\.\d+)\.\s+第(\d+)题', block)
-        if not qid_match:
-            continue
-
-        full_qid = qid_match.group(1)
-        qnum = qid_match.group(2)
-
-        # 提取题型和等级
-        type_level = full_qid.split('.')
-        q_type = {
-            '1': '单选题',
-            '2': '多选题',
-            '3': '判断题'
-        }.get(type_level[0], '未知题型')
-
-        # 只处理选择题和判断题
-        if q_type not in ['单选题', '多选题', '判断题']:
-            continue
-
-        q_level = {
-            '1': '初级工', '2': '中级工', '3': '高级工',
-            '4': '技师', '5': '高级技师'
-        }.get(type_level[1], '未知等级')
-
-        # 提取题干
-        content_start = block.find('\n', qid_match.end()) + 1
-        content_end = re.search(r'\n(?:[A-D]\.|正确答案)', block[content_start:])
-        if content_end:
-            content = block[content_start:content_start + content_end.start()].strip()
-        else:
-            content = block[content_start:].split('正确答案：')[0].strip()
-
-        # 清理题干内容
-        # 去除"第x页"字样及其变体
-        content = re.sub(r'第\s*\d+\s*页\s*[:：]?', '', content).strip()
-        # 去除多余的空格和换行
-        content = re.sub(r'\s+', ' ', content).strip()
-
-        # 提取选项（仅选择题）
-        options = {}
-        if q_type in ['单选题', '多选题']:
-            for opt in ['A', 'B', 'C', 'D']:
-                opt_match = re.search(rf'{opt}\.(.*?)(?:\n|$)', block)
-                if opt_match:
-                    options[opt] = opt_match.group(1).strip()
-
-        # 提取答案
-        answer_match = re.search(r'正确答案[:：]\s*([A-D]+|[正确错误]+)', block)
-        answer = answer_match.group(1) if answer_match else ""
-
-        # 提取评价点
-        eval_match = re.search(r'关联评价点的名称[:：]\s*(.+)', block)
-        eval_point = eval_match.group(1).strip() if eval_match else ""
-
-        questions.append({
-            "题型": q_type,
-            "等级": q_level,
-            "题号": full_qid,
-            "题目编号": int(qnum),
-            "题目内容": content,
-            "选项A": options.get('A', ''),
-            "选项B": options.get('B', ''),
-            "选项C": options.get('C', ''),
-            "选项D": options.get('D', ''),
-            "正确答案": answer,
-            "关联评价点": eval_point,
-            "工种": "变电设备检修工(开关)",
-            "工种定义": "从事电网变电站一次开关类设备验收、维护、检修的人员"
-        })
-
-    return questions
+    question_blocks = _RE_SPLIT.split(text)
+
+    # 各题目块互不相关：小题库直接逐块解析，大题库分发到进程池并行解析
+    # 两种方式都按原顺序逐题产出，不在内存中保留整个题库
+    if len(question_blocks) < PARALLEL_THRESHOLD or (os.cpu_count() or 1) < 2:
+        yield from filter(None, map(_parse_block, question_blocks))
+        return
+    with ProcessPoolExecutor() as executor:
+        yield from filter(None, executor.map(_parse_block, question_blocks, chunksize=256))
 
 
 def create_excel(questions):
-    df = pd.DataFrame(questions)
-
-    # 优化列顺序
-    df = df[['题型', '等级', '题号', '题目编号', '题目内容',
-             '选项A', '选项B', '选项C', '选项D',
-             '正确答案', '关联评价点', '工种', '工种定义']]
-
-    # 创建Excel
-    with pd.ExcelWriter('变电设备检修工(开关)技能题库.xlsx', engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='题库')
-
-        # 获取工作簿和工作表
-        workbook = writer.book
-        worksheet = writer.sheets['题库']
-
-        # 设置列宽
-        col_widths = {
-            'A': 8,  # 题型
-            'B': 10,  # 等级
-            'C': 10,  # 题号
-            'D': 8,  # 题目编号
-            'E': 80,  # 题目内容
-            'F': 30,  # 选项A
-            'G': 30,  # 选项B
-            'H': 30,  # 选项C
-            'I': 30,  # 选项D
-            'J': 8,  # 正确答案
-            'K': 35,  # 关联评价点
-            'L': 15,  # 工种
-            'M': 50  # 工种定义
-        }
-
-        for col, width in col_widths.items():
-            col_letter = get_column_letter(ord(col) - 64)
-            worksheet.column_dimensions[col_letter].width = width
-
-        # 设置自动换行
-        wrap_columns = ['E', 'F', 'G', 'H', 'I', 'K', 'M']
-        for col in wrap_columns:
-            col_letter = get_column_letter(ord(col) - 64)
-            for row in range(2, worksheet.max_row + 1):
-                cell = worksheet[f"{col_letter}{row}"]
-                cell.alignment = Alignment(wrapText=True, vertical='top')
-
-        # 添加筛选器
-        worksheet.auto_filter.ref = f"A1:{get_column_letter(worksheet.max_column)}{worksheet.max_row}"
-
-    return 'Excel文件已生成：变电设备检修工(开关)技能题库.xlsx'
+    # 直接生成 xlsx 的 XML 部件并打包，sheet1.xml 边解析边以流的方式写入压缩包
+    filename = '变电设备检修工(开关)技能题库.xlsx'
+    last_col = COL_LETTERS[len(COLUMNS) - 1]
+
+    # 每列单元格的开头片段：数值列不带类型，文本列使用内联字符串；换行列带上样式2
+    cell_heads = []
+    for letter in COL_LETTERS:
+        style = ' s="2"' if letter in WRAP_COLUMNS else ''
+        cell_heads.append((f'<c r="{letter}', f'"{style}>', f'"{style} t="inlineStr"><is><t xml:space="preserve">'))
+
+    with zipfile.ZipFile(filename, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml', _CONTENT_TYPES_XML)
+        zf.writestr('_rels/.rels', _ROOT_RELS_XML)
+        zf.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS_XML)
+        zf.writestr('xl/styles.xml', _STYLES_XML)
+
+        with io.TextIOWrapper(zf.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True),
+                              encoding='utf-8') as sheet:
+            sheet.write(
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            )
+
+            # 设置列宽，换行列同时设置列样式
+            sheet.write('<cols>')
+            for i, (letter, width) in enumerate(zip(COL_LETTERS, COL_WIDTHS), 1):
+                style = ' style="2"' if letter in WRAP_COLUMNS else ''
+                sheet.write(f'<col min="{i}" max="{i}" width="{width}"{style} customWidth="1"/>')
+            sheet.write('</cols><sheetData>')
+
+            # 写入表头
+            sheet.write('<row r="1">')
+            for letter, title in zip(COL_LETTERS, COLUMNS):
+                sheet.write(f'<c r="{letter}1" s="1" t="inlineStr"><is><t>{title}</t></is></c>')
+            sheet.write('</row>')
+
+            row_count = 0
+            for q in questions:
+                row_count += 1
+                # 行号每行只转换一次字符串，列字母已预先放进 cell_heads
+                r = str(row_count + 1)
+                parts = [f'<row r="{r}">']
+                for (head, num_tail, str_tail), value in zip(cell_heads, q):
+                    # 空字符串不写单元格
+                    if value == '':
+                        continue
+                    if isinstance(value, int):
+                        parts.append(f'{head}{r}{num_tail}<v>{value}</v></c>')
+                    else:
+                        parts.append(f'{head}{r}{str_tail}{_xml_text(value)}</t></is></c>')
+                parts.append('</row>')
+                sheet.write(''.join(parts))
+
+            # 添加筛选器
+            sheet.write(f'</sheetData><autoFilter ref="A1:{last_col}{row_count + 1}"/></worksheet>')
+
+        # 工作簿需要筛选范围的定义名，行数确定后最后写入
+        zf.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheets><sheet name="题库" sheetId="1" r:id="rId1"/></sheets>'
+            '<definedNames><definedName name="_xlnm._FilterDatabase" localSheetId="0" hidden="1">'
+            f'题库!$A$1:${last_col}${row_count + 1}</definedName></definedNames>'
+            '</workbook>'
+        ))
+
+    return f'成功解析 {row_count} 道题目！\nExcel文件已生成：{filename}'
+
+
+def create_csv(questions):
+    # 不需要Excel格式时直接输出CSV；utf-8-sig 带BOM，Excel打开中文不会乱码
+    filename = '变电设备检修工(开关)技能题库.csv'
+    row_count = 0
+    with open(filename, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for q in questions:
+            row_count += 1
+            writer.writerow(q)
+    return f'成功解析 {row_count} 道题目！\nCSV文件已生成：{filename}'
 
 
 # ==== 主程序开始 ====
 if __name__ == "__main__":
     # 1. 从文件读取题库文本
     try:
-        with open('题库文本.txt', 'r', encoding='utf-8') as f:
-            text_content = f.read()
+        text_content = read_text('题库文本.txt')
         print("题库文本读取成功！")
     except FileNotFoundError:
         print("错误：找不到题库文本.txt文件！")
         print("请确保文件与脚本在同一目录下。")
         exit(1)
     except UnicodeDecodeError:
-        print("错误：文件编码问题！尝试使用GBK编码...")
-        try:
-            with open('题库文本.txt', 'r', encoding='gbk') as f:
-                text_content = f.read()
-            print("使用GBK编码读取成功！")
-        except:
-            print("错误：无法读取文件！请检查文件编码。")
-            exit(1)
-
-    # 2. 解析题目
-    print("开始解析题目...")
-    questions = parse_questions(text_content)
-    print(f"成功解析 {len(questions)} 道题目！")
-
-    # 3. 生成Excel
-    print("开始生成Excel文件...")
-    result = create_excel(questions)
-    print(result)
\ No newline at end of file
+        print("错误：无法读取文件！请检查文件编码。")
+        exit(1)
+
+    # 2. 解析题目并生成Excel（边解析边写入）；加 --csv 参数时改为输出CSV
+    if '--csv' in sys.argv[1:]:
+        print("开始解析题目并生成CSV文件...")
+        result = create_csv(parse_questions(text_content))
+    else:
+        print("开始解析题目并生成Excel文件...")
+        result = create_excel(parse_questions(text_content))
+    print(result)
@@ -1,86 +1,453 @@
 import sys
 import os
+import bisect
+import hashlib
+import itertools
+import numpy as np
 import pandas as pd
 import sqlite3
 import glob
-import traceback
-from PySide6.QtCore import Qt, QTimer, QSize, Signal
+import logging
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QThread, QTimer, QSize, Signal
 from PySide6.QtGui import QFont, QIcon, QPalette, QColor, QTextDocument
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QPushButton, QRadioButton, QCheckBox, QButtonGroup, QTabWidget,
     QProgressBar, QMessageBox, QFileDialog, QSizePolicy, QTextBrowser,
-    QFrame, QListWidget, QListWidgetItem, QAbstractItemView, QComboBox,
+    QFrame, QListView, QAbstractItemView, QComboBox,
     QInputDialog
 )
 from PySide6.QtPrintSupport import QPrinter
 
+log = logging.getLogger(__name__)
+
+# 可选的 Rust Excel 解析引擎，未安装时使用 pandas 默认引擎
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = None
+
+# 题库Excel必须包含的列
+QUESTION_COLUMNS = ['题型', '等级', '题号', '题目编号', '题目内容',
+                    '选项A', '选项B', '选项C', '选项D', '正确答案']
+
+# 界面字体只构造一次，各控件共用
+FONT_OPTION = QFont("微软雅黑", 25)  # 选项
+FONT_QUESTION = QFont("微软雅黑", 25, QFont.Bold)  # 题目
+FONT_TEXT = QFont("微软雅黑", 14)  # 解析、错题列表、统计
+FONT_PROGRESS = QFont("微软雅黑", 15, QFont.Bold)  # 进度条
+FONT_FEEDBACK = QFont("微软雅黑", 100)  # 答题反馈的对号/错号
+FEEDBACK_SIZE = 200  # 答题反馈标签的边长
+
+# 题目和解析的HTML模板：第一行显示题型，第二行显示题号和内容（题号用不同颜色）
+QUESTION_HTML = (
+    '<div style="text-align: center;">'
+    '<div style="font-size: 25px; color: #1976D2; font-weight: bold; font-family: 微软雅黑;">【{type}】</div>'
+    '<div><span style="color: #F44336; font-weight: bold; font-family: 微软雅黑;">{id}.</span> '
+    '<span style="font-family: 微软雅黑;">{content}</span></div>'
+    '</div>'
+)
+EXPLANATION_HTML = (
+    '<div style="font-family: 微软雅黑; font-size: 16px;">'
+    '<h3 style="color: #FF9800; margin-top: 0; font-family: 微软雅黑;">题目解析</h3>'
+    '<p style="font-family: 微软雅黑;">{explanation}</p>'
+    '</div>'
+)
+
+# 主题调色板（颜色角色, 颜色）和样式表，切换主题时直接套用
+LIGHT_PALETTE_COLORS = (
+    (QPalette.ColorRole.Window, QColor(245, 245, 245)),
+    (QPalette.ColorRole.WindowText, Qt.GlobalColor.black),
+    (QPalette.ColorRole.Base, QColor(255, 255, 255)),
+    (QPalette.ColorRole.AlternateBase, QColor(240, 240, 240)),
+    (QPalette.ColorRole.ToolTipBase, Qt.GlobalColor.white),
+    (QPalette.ColorRole.ToolTipText, Qt.GlobalColor.black),
+    (QPalette.ColorRole.Text, Qt.GlobalColor.black),
+    (QPalette.ColorRole.Button, QColor(248, 248, 248)),
+    (QPalette.ColorRole.ButtonText, Qt.GlobalColor.black),
+    (QPalette.ColorRole.BrightText, Qt.GlobalColor.red),
+    (QPalette.ColorRole.Highlight, QColor(74, 144, 226)),
+    (QPalette.ColorRole.HighlightedText, Qt.GlobalColor.white),
+)
+LIGHT_STYLE = """
+    QMainWindow {
+        background-color: #F5F5F5;
+        font-family: "微软雅黑";
+    }
+    QTabWidget::pane { 
+        border: 2px solid #CCCCCC; 
+        border-top: none;
+        border-radius: 8px;
+        background-color: white;
+        padding: 10px;
+        font-family: "微软雅黑";
+    }
+    QTabBar::tab { 
+        background: #E0E0E0; 
+        padding: 12px 25px; 
+        border: 2px solid #CCCCCC; 
+        border-bottom: none; 
+        border-top-left-radius: 8px; 
+        border-top-right-radius: 8px;
+        font-size: 14px;
+        font-weight: bold;
+        font-family: "微软雅黑";
+    }
+    QTabBar::tab:selected { 
+        background: #4A90E2; 
+        color: white;
+        border-color: #4A90E2;
+    }
+    QFrame { 
+        background: white; 
+        border-radius: 8px;
+    }
+    QLabel, QRadioButton, QCheckBox, QTextBrowser { 
+        color: #333333; 
+        font-family: "微软雅黑";
+    }
+    QRadioButton[correct="true"], QCheckBox[correct="true"] {
+        color: green;
+        font-size: 30pt;
+        font-weight: bold;
+    }
+    QComboBox {
+        padding: 8px 15px;
+        border-radius: 5px;
+        border: 2px solid #CCCCCC;
+        background-color: white;
+        font-family: "微软雅黑";
+    }
+    QComboBox:hover {
+        border-color: #4A90E2;
+    }
+    QComboBox::drop-down {
+        border-left: 2px solid #CCCCCC;
+    }
+    QPushButton {
+        font-family: "微软雅黑";
+    }
+    QProgressBar {
+        font-family: "微软雅黑";
+    }
+"""
+
+DARK_PALETTE_COLORS = (
+    (QPalette.ColorRole.Window, QColor(40, 40, 40)),
+    (QPalette.ColorRole.WindowText, Qt.GlobalColor.white),
+    (QPalette.ColorRole.Base, QColor(30, 30, 30)),
+    (QPalette.ColorRole.AlternateBase, QColor(45, 45, 45)),
+    (QPalette.ColorRole.ToolTipBase, QColor(25, 25, 25)),
+    (QPalette.ColorRole.ToolTipText, Qt.GlobalColor.white),
+    (QPalette.ColorRole.Text, Qt.GlobalColor.white),
+    (QPalette.ColorRole.Button, QColor(50, 50, 50)),
+    (QPalette.ColorRole.ButtonText, Qt.GlobalColor.white),
+    (QPalette.ColorRole.BrightText, Qt.GlobalColor.red),
+    (QPalette.ColorRole.Highlight, QColor(74, 144, 226)),
+    (QPalette.ColorRole.HighlightedText, Qt.GlobalColor.white),
+)
+DARK_STYLE = """
+    QMainWindow {
+        background-color: #282828;
+        font-family: "微软雅黑";
+    }
+    QTabWidget::pane { 
+        border: 2px solid #555555; 
+        border-top: none;
+        border-radius: 8px;
+        background-color: #333333;
+        padding: 10px;
+        font-family: "微软雅黑";
+    }
+    QTabBar::tab { 
+        background: #444444; 
+        color: #CCCCCC;
+        padding: 12px 25px; 
+        border: 2px solid #555555; 
+        border-bottom: none; 
+        border-top-left-radius: 8px; 
+        border-top-right-radius: 8px;
+        font-size: 14px;
+        font-weight: bold;
+        font-family: "微软雅黑";
+    }
+    QTabBar::tab:selected { 
+        background: #4A90E2; 
+        color: white;
+        border-color: #4A90E2;
+    }
+    QFrame { 
+        background: #333333; 
+        border-radius: 8px;
+    }
+    QLabel, QRadioButton, QCheckBox, QTextBrowser { 
+        color: #EEEEEE; 
+        font-family: "微软雅黑";
+    }
+    QRadioButton[correct="true"], QCheckBox[correct="true"] {
+        color: green;
+        font-size: 30pt;
+        font-weight: bold;
+    }
+    QComboBox {
+        padding: 8px 15px;
+        border-radius: 5px;
+        border: 2px solid #555555;
+        background-color: #333333;
+        color: #EEEEEE;
+        font-family: "微软雅黑";
+    }
+    QComboBox:hover {
+        border-color: #4A90E2;
+    }
+    QComboBox::drop-down {
+        border-left: 2px solid #555555;
+    }
+    QPushButton {
+        font-family: "微软雅黑";
+    }
+    QProgressBar {
+        font-family: "微软雅黑";
+    }
+"""
+
+# 导出错题PDF时每道题的HTML模板，题目块的样式写在文档的默认样式表中
+EXPORT_STYLE = (
+    'div.question { margin-bottom: 20px; border: 1px solid #ccc; padding: 10px; page-break-inside: avoid; }'
+)
+EXPORT_QUESTION_HTML = (
+    '<div class="question">'
+    '<p> {id}: {content}</p>'
+    '{options}'
+    '<p><b>正确答案: {answer}</b></p>'
+    '</div>'
+)
+EXPORT_OPTIONS_HTML = '<ul>{}</ul>'  # 没有选项的题目（判断题、填空题等）不输出列表
+EXPORT_OPTION_HTML = '<li>{}. {}</li>'
+# 题目文字中的 < > & 等字符需转义后再放入HTML，否则会被当成标签解析
+HTML_ESCAPE_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'})
+
+# 解析后的题库表缓存目录，再次启动时不必重新解析Excel
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.wxjb_cache')
+# 缓存内容的格式版本，读取的列、解析方式或缓存文件格式变化时加一，旧缓存随之失效
+CACHE_VERSION = 2
+
+
+def read_question_table(file_path):
+    """读取题库Excel；文件未修改时直接读取上次解析结果的缓存"""
+    # 每个题库文件只对应一个缓存文件（文件修改后覆盖旧缓存），修改时间和大小存放在缓存中用于校验
+    stat = os.stat(file_path)
+    stamp = (stat.st_mtime_ns, stat.st_size, CACHE_VERSION)
+    key = hashlib.blake2b(os.path.abspath(file_path).encode()).hexdigest()[:16]
+    cache_path = os.path.join(CACHE_DIR, f'{key}.pkl')
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                cached_stamp, df = pickle.load(f)
+            if cached_stamp == stamp:
+                return df
+        except Exception as e:
+            # 缓存损坏或由不兼容的 pandas 版本写入时，重新解析Excel
+            log.warning("题库缓存读取失败，重新解析: %s", e)
+
+    # 只读取需要的列；安装了 python-calamine 时使用其 Rust 解析引擎
+    df = pd.read_excel(file_path, engine=EXCEL_ENGINE,
+                       usecols=lambda col: col in QUESTION_COLUMNS or col == '解析')
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(cache_path, 'wb') as f:
+            pickle.dump((stamp, df), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        log.warning("写入题库缓存失败: %s", e)
+    return df
+
+
+def escape_html(value):
+    """转义HTML特殊字符（非字符串的值先转为字符串）"""
+    return str(value).translate(HTML_ESCAPE_TABLE)
+
+
+@dataclass(slots=True)
+class Question:
+    """题目（只包含题目文本；答题进度见 QuestionProgress）"""
+    index: int  # 在所属题库中的行号，即进度数组的下标
+    type: str
+    level: str
+    id: str
+    qid: str
+    content: str
+    options: dict  # {'A': 选项文本, ...}，缺失的选项为空字符串
+    answer: str
+    explanation: str
+
+
+class QuestionProgress:
+    """题库答题进度，按列存储：每个字段一个numpy数组，下标与题目的 index 对应"""
+
+    def __init__(self, size):
+        self.answered = np.zeros(size, np.int32)
+        self.correct = np.zeros(size, np.int32)  # 连续答对次数
+        self.wrong = np.zeros(size, np.int32)
+        self.marked = np.zeros(size, np.bool_)
+        self.mastered = np.zeros(size, np.bool_)
+        # 上次保存以来单独修改过的行号；None 表示进度被整体修改过（或还没保存过），需要写入整个题库
+        self.changed = None
+        # 后台写入失败的标志，由数据库线程设置；changed 只在界面线程中读写，下次取修改时再整体保存
+        self.save_failed = False
+
+    def mark_changed(self, index):
+        """记录某一行的进度被修改"""
+        if self.changed is not None:
+            self.changed.add(index)
+
+    def mark_all_changed(self):
+        """进度被整体修改，下次保存时写入整个题库"""
+        self.changed = None
+
+    def take_changes(self):
+        """取出上次保存以来修改过的行号（None 表示需要整体保存），并开始记录之后的修改"""
+        changed, self.changed = self.changed, set()
+        if self.save_failed:
+            # 之前的写入没有落盘，这次重写整个题库
+            self.save_failed = False
+            changed = None
+        return changed
+
 
 class QuestionManager:
     """题库管理类，负责加载Excel题库和管理题目数据"""
 
     def __init__(self):
+        self.question_sets = {}  # 存储多个题库 {题库名称: 题目列表}
+        self.progress_sets = {}  # 各题库的答题进度 {题库名称: QuestionProgress}
+        self.progress = QuestionProgress(0)  # 当前题库的答题进度
+        self._index_by_id = {}  # 各题库题号到行号的映射 {题库名称: {题号文本: 行号}}，按需建立
         self.questions = []
         self.current_question_index = 0
-        self.question_sets = {}  # 存储多个题库 {题库名称: 题目列表}
         self.current_set = ""  # 当前题库名称
         self.current_file_path = None  # 当前题库文件路径
 
-    def load_from_excel(self, file_path):
-        """从Excel文件加载题库"""
-        try:
-            df = pd.read_excel(file_path)
-            required_columns = ['题型', '等级', '题号', '题目编号', '题目内容',
-                                '选项A', '选项B', '选项C', '选项D', '正确答案']
-
-            # 验证列名
-            if not all(col in df.columns for col in required_columns):
-                missing = [col for col in required_columns if col not in df.columns]
-                raise ValueError(f"Excel文件缺少必要的列: {', '.join(missing)}")
-
-            # 转换为题目字典列表
-            questions = []
-            for _, row in df.iterrows():
-                question = {
-                    'type': row['题型'],
-                    'level': row['等级'],
-                    'id': row['题号'],
-                    'qid': row['题目编号'],
-                    'content': row['题目内容'],
-                    'options': {
-                        'A': row['选项A'],
-                        'B': row['选项B'],
-                        'C': row['选项C'],
-                        'D': row['选项D']
-                    },
-                    'answer': row['正确答案'],
-                    'explanation': row.get('解析', '暂无解析'),
-                    'answered': 0,
-                    'correct': 0,  # 连续答对次数
-                    'wrong': 0,
-                    'marked': False,
-                    'mastered': False
-                }
-                questions.append(question)
-
-            # 获取题库名称（使用文件名）
-            set_name = os.path.basename(file_path).split('.')[0]
-            self.question_sets[set_name] = questions
-            self.current_set = set_name
-            self.current_file_path = file_path
-            return True, f"成功加载 {len(questions)} 道题目"
-        except Exception as e:
-            return False, f"加载题库失败: {str(e)}"
+    @property
+    def questions(self):
+        """当前练习的题目列表"""
+        return self._questions
+
+    @questions.setter
+    def questions(self, questions):
+        self._questions = questions
+        # 当前列表中每道题在进度数组中的行号，用于按列批量取值
+        self._rows = np.fromiter((q.index for q in questions), np.intp, len(questions))
+        self._unmastered = None  # 未掌握题目的下标（升序），导航时按需重建
+        self._wrong_cache = None  # 错题列表缓存，错误次数被整体修改时失效
+        self._wrong_positions = None  # 错题列表中各题在当前题目列表中的下标（升序）
+        self._marked_cache = None  # 标记题目列表缓存，标记状态变化时失效
+        self._totals = None  # [已答, 连续答对, 已掌握] 题数，答题时增量更新，进度被整体修改时失效
+        self._by_id = None  # 题号到 (列表下标, 题目) 的映射，按需建立
+
+    @property
+    def by_id(self):
+        """当前题目列表中题号到 (列表下标, 题目) 的映射"""
+        if self._by_id is None:
+            self._by_id = {q.id: (i, q) for i, q in enumerate(self._questions)}
+        return self._by_id
+
+    def invalidate_navigation(self):
+        """题目的掌握状态被外部直接修改后调用，下次导航时重建下标"""
+        self._unmastered = None
+
+    def _unmastered_indices(self):
+        """获取未掌握题目的下标列表"""
+        if self._unmastered is None:
+            self._unmastered = np.flatnonzero(~self.progress.mastered[self._rows]).tolist()
+        return self._unmastered
+
+    def first_unmastered_index(self):
+        """第一个未掌握题目的下标，全部已掌握时返回 None"""
+        unmastered = self._unmastered_indices()
+        return unmastered[0] if unmastered else None
+
+    @staticmethod
+    def parse_excel(file_path):
+        """解析Excel题库，返回题目列表（不修改题库管理器，可在后台线程中调用）"""
+        df = read_question_table(file_path)
+
+        # 验证列名
+        if not all(col in df.columns for col in QUESTION_COLUMNS):
+            missing = [col for col in QUESTION_COLUMNS if col not in df.columns]
+            raise ValueError(f"Excel文件缺少必要的列: {', '.join(missing)}")
+
+        # 缺失的选项（如判断题）和答案统一为空字符串，数字单元格转为文字，缺失的解析填默认文字，界面上不必逐个判断 NaN
+        text_columns = ['选项A', '选项B', '选项C', '选项D', '正确答案']
+        df[text_columns] = df[text_columns].fillna('').astype(str)
+        if '解析' in df.columns:
+            df['解析'] = df['解析'].fillna('暂无解析')
+
+        # 按列取出后逐行构造题目对象（避免 iterrows 逐行构造 Series）
+        # 题目对象只保存题目文本，答题进度存放在 QuestionProgress 的数组中，index 为所在行号
+        if '解析' in df.columns:
+            explanations = df['解析'].tolist()
+        else:
+            explanations = itertools.repeat('暂无解析')
+        columns = [df[col].tolist() for col in QUESTION_COLUMNS]
+        return [
+            Question(i, q_type, level, q_id, qid, content,
+                     {'A': a, 'B': b, 'C': c, 'D': d}, answer, explanation)
+            for i, (q_type, level, q_id, qid, content, a, b, c, d, answer, explanation)
+            in enumerate(zip(*columns, explanations))
+        ]
+
+    def add_question_set(self, file_path, questions):
+        """登记解析好的题库（题库名称取文件名），返回题库名称；同名题库会被替换"""
+        set_name = os.path.basename(file_path).split('.')[0]
+        self.question_sets[set_name] = questions
+        self.progress_sets[set_name] = QuestionProgress(len(questions))
+        self._index_by_id.pop(set_name, None)
+        self.current_file_path = file_path
+        return set_name
 
     def set_current_set(self, set_name):
         """设置当前题库"""
         if set_name in self.question_sets:
             self.current_set = set_name
+            self.progress = self.progress_sets[set_name]
             self.questions = self.question_sets[set_name]
             self.current_question_index = 0
             return True
         return False
 
+    def apply_progress(self, set_name, rows):
+        """将数据库中的进度记录 (题号, 已答, 连续答对, 错误, 标记, 掌握) 应用到指定题库，返回应用的条数"""
+        if not rows:
+            return 0
+        # 数据库读出的题号统一为文本（question_id 列为 INTEGER 亲和性，纯数字题号会被存成数字）
+        id_to_index = self._index_by_id.get(set_name)
+        if id_to_index is None:
+            id_to_index = {str(q.id): q.index for q in self.question_sets[set_name]}
+            self._index_by_id[set_name] = id_to_index
+
+        # 记录按列转置后整体转换为数组，题号映射为行号（题库中已不存在的题目为 -1）
+        ids, answered, correct, wrong, marked, mastered = zip(*rows)
+        index = np.fromiter(map(id_to_index.get, ids, itertools.repeat(-1)), np.intp, len(ids))
+        found = index >= 0
+        index = index[found]
+
+        # 按列整体写入进度数组
+        progress = self.progress_sets[set_name]
+        progress.answered[index] = np.array(answered)[found]
+        progress.correct[index] = np.array(correct)[found]
+        progress.wrong[index] = np.array(wrong)[found]
+        progress.marked[index] = np.array(marked, np.bool_)[found]
+        progress.mastered[index] = np.array(mastered, np.bool_)[found]
+        progress.mark_all_changed()
+        if set_name == self.current_set:
+            self.invalidate_navigation()
+            self._wrong_cache = self._marked_cache = self._totals = None
+        return len(index)
+
     def get_current_question(self):
         """获取当前题目"""
         if not self.questions:
@@ -89,109 +456,186 @@ class QuestionManager:
 
     def next_question(self):
         """移动到下一题（跳过已掌握的题目）"""
-        # 找到下一个未掌握的题目
-        start_index = self.current_question_index + 1
-        for i in range(start_index, len(self.questions)):
-            if not self.questions[i]['mastered']:
-                self.current_question_index = i
-                return True
+        # 在未掌握题目的下标中二分查找下一个
+        unmastered = self._unmastered_indices()
+        pos = bisect.bisect_right(unmastered, self.current_question_index)
+        if pos < len(unmastered):
+            self.current_question_index = unmastered[pos]
+            return True
         return False
 
     def prev_question(self):
         """移动到上一题（跳过已掌握的题目）"""
-        # 找到上一个未掌握的题目
-        start_index = self.current_question_index - 1
-        for i in range(start_index, -1, -1):
-            if not self.questions[i]['mastered']:
-                self.current_question_index = i
-                return True
+        # 在未掌握题目的下标中二分查找上一个
+        unmastered = self._unmastered_indices()
+        pos = bisect.bisect_left(unmastered, self.current_question_index)
+        if pos > 0:
+            self.current_question_index = unmastered[pos - 1]
+            return True
         return False
 
     def prev_question_exists(self):
         """检查是否存在上一题（跳过已掌握的题目）"""
-        for i in range(self.current_question_index - 1, -1, -1):
-            if not self.questions[i]['mastered']:
-                return True
-        return False
+        return bisect.bisect_left(self._unmastered_indices(), self.current_question_index) > 0
 
     def next_question_exists(self):
         """检查是否存在下一题（跳过已掌握的题目）"""
-        for i in range(self.current_question_index + 1, len(self.questions)):
-            if not self.questions[i]['mastered']:
-                return True
-        return False
+        unmastered = self._unmastered_indices()
+        return bisect.bisect_right(unmastered, self.current_question_index) < len(unmastered)
 
     def record_answer(self, is_correct):
         """记录答题结果"""
         q = self.get_current_question()
         if q:
-            q['answered'] += 1
+            p = self.progress
+            i = q.index
+            totals = self._totals
+            if totals is not None:
+                # 只有这一题的状态会变化，按变化前后的差值更新统计
+                totals[0] += int(p.answered[i] == 0)
+                totals[1] += int(p.correct[i] == 0) if is_correct else -int(p.correct[i] > 0)
+            p.answered[i] += 1
+            p.mark_changed(i)
             if is_correct:
                 # 增加连续答对次数
-                q['correct'] += 1
-                print(f"题目 {q['id']} 连续答对次数: {q['correct']}")  # 调试信息
+                p.correct[i] += 1
+                log.debug("题目 %s 连续答对次数: %s", q.id, p.correct[i])  # 调试信息
 
                 # 连续答对两次标记为已掌握
-                if q['correct'] >= 2 and not q['mastered']:
-                    q['mastered'] = True
-                    print(f"题目 {q['id']} 标记为已掌握")  # 调试信息
+                if p.correct[i] >= 2 and not p.mastered[i]:
+                    p.mastered[i] = True
+                    if totals is not None:
+                        totals[2] += 1
+                    # 从未掌握下标中移除当前题目
+                    if self._unmastered is not None:
+                        pos = bisect.bisect_left(self._unmastered, self.current_question_index)
+                        if pos < len(self._unmastered) and self._unmastered[pos] == self.current_question_index:
+                            del self._unmastered[pos]
+                    log.debug("题目 %s 标记为已掌握", q.id)  # 调试信息
             else:
                 # 答错时重置连续答对次数
-                q['wrong'] += 1
-                q['correct'] = 0
-                print(f"题目 {q['id']} 答错，重置连续答对次数")  # 调试信息
+                p.wrong[i] += 1
+                p.correct[i] = 0
+                # 第一次答错时按题目顺序插入错题列表（生成新列表，已交给界面的旧列表保持不变）
+                if p.wrong[i] == 1 and self._wrong_cache is not None:
+                    pos = bisect.bisect_left(self._wrong_positions, self.current_question_index)
+                    self._wrong_cache = self._wrong_cache[:pos] + [q] + self._wrong_cache[pos:]
+                    self._wrong_positions.insert(pos, self.current_question_index)
+                log.debug("题目 %s 答错，重置连续答对次数", q.id)  # 调试信息
 
     def get_wrong_questions(self):
-        """获取所有错题"""
-        return [q for q in self.questions if q['wrong'] > 0]
+        """获取所有错题（结果会被缓存，调用方不要修改返回的列表）"""
+        if self._wrong_cache is None:
+            questions = self.questions
+            self._wrong_positions = np.flatnonzero(self.progress.wrong[self._rows] > 0).tolist()
+            self._wrong_cache = [questions[k] for k in self._wrong_positions]
+        return self._wrong_cache
 
     def get_marked_questions(self):
-        """获取所有标记的题目"""
-        return [q for q in self.questions if q['marked']]
+        """获取所有标记的题目（结果缓存到标记状态变化为止，调用方不要修改返回的列表）"""
+        if self._marked_cache is None:
+            questions = self.questions
+            self._marked_cache = [questions[k] for k in np.flatnonzero(self.progress.marked[self._rows])]
+        return self._marked_cache
+
+    def set_marked(self, question, marked):
+        """标记/取消标记题目"""
+        self.progress.marked[question.index] = marked
+        self.progress.mark_changed(question.index)
+        self._marked_cache = None
 
     def get_progress(self):
         """获取进度信息"""
-        total = len(self.questions)
-        answered = sum(1 for q in self.questions if q['answered'] > 0)
-        correct = sum(1 for q in self.questions if q['correct'] > 0)
-        mastered = sum(1 for q in self.questions if q['mastered'])
+        rows = self._rows
+        if self._totals is None:
+            p = self.progress
+            self._totals = [int(np.count_nonzero(p.answered[rows] > 0)),
+                            int(np.count_nonzero(p.correct[rows] > 0)),
+                            int(np.count_nonzero(p.mastered[rows]))]
+        total = len(rows)
+        answered, correct, mastered = self._totals
         unmastered = total - mastered  # 未掌握题数
         return total, answered, correct, mastered, unmastered
 
     def reset_progress(self, exclude_mastered=True):
         """重置当前题库的进度（除了已掌握的题目）"""
-        for q in self.questions:
-            if exclude_mastered and q['mastered']:
-                continue
-            q['answered'] = 0
-            # 不要重置连续答对次数 (q['correct'])
-            # 不要重置错误次数 (q['wrong'])
-            q['marked'] = False
-            # 保留连续答对次数、错误次数和已掌握状态
+        p = self.progress
+        rows = self._rows
+        if exclude_mastered:
+            rows = rows[~p.mastered[rows]]
+        p.answered[rows] = 0
+        p.marked[rows] = False
+        p.mark_all_changed()
+        self._marked_cache = self._totals = None
+        # 保留连续答对次数、错误次数和已掌握状态
+
+    def mastered_wrong_count_stats(self):
+        """已掌握题目按错误次数统计，返回按错误次数升序的 [(错误次数, 题数), ...]"""
+        p = self.progress
+        rows = self._rows
+        counts, sizes = np.unique(p.wrong[rows[p.mastered[rows]]], return_counts=True)
+        return list(zip(counts.tolist(), sizes.tolist()))
 
     def release_mastered_questions_by_wrong_count(self, threshold):
         """根据错误次数释放已掌握的题目"""
-        count = 0
-        for q in self.questions:
-            if q['mastered'] and q['wrong'] >= threshold:
-                q['mastered'] = False
-                q['correct'] = 0  # 重置连续答对次数
-                count += 1
+        p = self.progress
+        rows = self._rows
+        rows = rows[p.mastered[rows] & (p.wrong[rows] >= threshold)]
+        p.mastered[rows] = False
+        p.correct[rows] = 0  # 重置连续答对次数
+        count = len(rows)
+        if count:
+            p.mark_all_changed()
+            self.invalidate_navigation()
+            self._totals = None
         return count
 
 
+class ExcelLoader(QThread):
+    """在后台线程中依次解析题库Excel，避免启动或导入大题库时界面卡住"""
+
+    def __init__(self, file_paths, parent=None):
+        super().__init__(parent)
+        self.file_paths = list(file_paths)
+        # (文件路径, 题目列表（失败时为 None）, 提示信息)，线程结束（finished）后在界面线程读取
+        self.results = []
+
+    def run(self):
+        for file_path in self.file_paths:
+            try:
+                questions = QuestionManager.parse_excel(file_path)
+                self.results.append((file_path, questions, f"成功加载 {len(questions)} 道题目"))
+            except Exception as e:
+                self.results.append((file_path, None, f"加载题库失败: {str(e)}"))
+
+
 class DatabaseManager:
     """数据库管理类，使用SQLite存储用户数据"""
 
+    INSERT_PROGRESS_SQL = '''
+        INSERT INTO user_progress
+            (question_id, answered, correct, wrong, marked, mastered, set_name)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    '''
+
     def __init__(self, db_path='user_data.db'):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
+        # 连接只在单线程的数据库执行器中使用（建表除外），写入不阻塞界面，读写按提交顺序串行执行
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db')
         self.create_tables()
 
     def create_tables(self):
         """创建数据库表"""
         cursor = self.conn.cursor()
 
+        # WAL 日志 + NORMAL 同步级别，减少每次保存时的 fsync 次数；加大页缓存并使用内存映射读取
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA cache_size=-20000")
+        cursor.execute("PRAGMA mmap_size=134217728")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+
         # 创建 user_progress 表（如果不存在）
         cursor.execute('''
                        CREATE TABLE IF NOT EXISTS user_progress
@@ -238,148 +682,287 @@ class DatabaseManager:
             # 添加 set_name 列
             cursor.execute("ALTER TABLE user_progress ADD COLUMN set_name TEXT")
 
-        self.conn.commit()
-
-    def save_progress(self, questions, current_index, set_name):
-        """保存当前题库的进度"""
-        print(f"保存进度: 题库={set_name}, 位置={current_index}, 题目数={len(questions)}")
-        cursor = self.conn.cursor()
-
-        # 清空旧数据
-        cursor.execute("DELETE FROM user_progress WHERE set_name=?", (set_name,))
-        print(f"已清空旧数据: 题库={set_name}")
-
-        # 插入新数据
-        for q in questions:
-            cursor.execute('''
-                           INSERT INTO user_progress
-                               (question_id, answered, correct, wrong, marked, mastered, set_name)
-                           VALUES (?, ?, ?, ?, ?, ?, ?)
-                           ''', (q['id'], q['answered'], q['correct'], q['wrong'],
-                                 int(q['marked']), int(q['mastered']), set_name))
-            print(
-                f"保存题目进度: ID={q['id']}, 已答={q['answered']}, 正确={q['correct']}, 错误={q['wrong']}, 标记={q['marked']}, 掌握={q['mastered']}")
-
-        # 保存当前位置（为每个题库保存独立的位置）
-        cursor.execute('''
-            INSERT OR REPLACE INTO app_state (key, value)
-            VALUES (?, ?)
-        ''', (f'last_position_{set_name}', current_index))
-        print(f"保存当前位置: 题库={set_name}, 位置={current_index}")
-
-        # 保存当前题库
+        # 按题库读取和删除进度时走索引，避免全表扫描
         cursor.execute('''
-            INSERT OR REPLACE INTO app_state (key, value)
-            VALUES ('last_set', ?)
-        ''', (set_name,))
-        print(f"保存当前题库: {set_name}")
+                       CREATE INDEX IF NOT EXISTS idx_progress_setname
+                           ON user_progress (set_name, question_id)
+                       ''')
 
         self.conn.commit()
-        print(f"进度保存完成: 题库={set_name}")
 
-    def save_all_progress(self, question_manager):
-        """保存所有题库的进度"""
-        print(f"保存所有进度: 当前题库={question_manager.current_set}, 位置={question_manager.current_question_index}")
-        cursor = self.conn.cursor()
+    @staticmethod
+    def _progress_snapshot(questions, progress, set_name, rows=None):
+        """复制一个题库的进度数组（rows 为行号列表时只复制这些行），之后界面继续修改进度不影响本次保存"""
+        if rows is None:
+            return (questions, progress.answered.copy(), progress.correct.copy(), progress.wrong.copy(),
+                    progress.marked.copy(), progress.mastered.copy(), set_name)
+        return ([questions[i] for i in rows], progress.answered[rows], progress.correct[rows],
+                progress.wrong[rows], progress.marked[rows], progress.mastered[rows], set_name)
+
+    @staticmethod
+    def _progress_rows(snapshot):
+        """按题目顺序逐条生成待插入的记录，不在内存中构造完整的记录列表"""
+        questions, answered, correct, wrong, marked, mastered, set_name = snapshot
+        return zip(
+            (q.id for q in questions),
+            answered.tolist(), correct.tolist(), wrong.tolist(),
+            marked.astype(int).tolist(), mastered.astype(int).tolist(),
+            itertools.repeat(set_name)
+        )
 
-        # 清空所有旧数据
-        cursor.execute("DELETE FROM user_progress")
-        print("已清空所有旧数据")
+    @staticmethod
+    def _report_error(future):
+        """后台写入失败时输出错误信息"""
+        error = future.exception()
+        if error is not None:
+            log.error("保存进度失败: %s", error, exc_info=error)
+
+    def _submit_write(self, func, *args):
+        """把写操作提交到数据库线程，立即返回 Future"""
+        future = self._executor.submit(func, *args)
+        future.add_done_callback(self._report_error)
+        return future
+
+    def close(self):
+        """等待尚未完成的写入，然后关闭数据库连接"""
+        self._executor.shutdown(wait=True)
+        self.conn.close()
+
+    def save_progress(self, questions, progress, current_index, set_name):
+        """保存当前题库的进度（questions 为完整题库，progress 为其进度数组），在后台线程写入"""
+        # 只写入上次保存以来修改过的题目；进度被整体修改过时重写整个题库
+        changed = progress.take_changes()
+        rows = None if changed is None else sorted(changed)
+        log.debug("保存进度: 题库=%s, 位置=%s, 写入题目数=%s", set_name, current_index,
+                  len(questions) if rows is None else len(rows))
+        # 在调用线程中取出进度快照，记录在数据库线程中生成
+        snapshot = self._progress_snapshot(questions, progress, set_name, rows)
+        future = self._submit_write(self._write_progress, snapshot, current_index, rows is not None)
+
+        def retry_on_failure(f):
+            """写入失败时这些修改没有落盘，标记为下次保存时重写整个题库（在数据库线程中调用，只设置标志）"""
+            if f.exception() is not None:
+                log.warning("题库 %s 的进度未能保存，下次保存时将重写整个题库", set_name)
+                progress.save_failed = True
+
+        future.add_done_callback(retry_on_failure)
+        return future
+
+    def _write_progress(self, snapshot, current_index, partial=False):
+        """写入一个题库的进度（在数据库线程中执行）；partial 为 True 时快照中只有修改过的题目"""
+        set_name = snapshot[-1]
+        # 清空旧数据、批量插入新数据、保存位置在同一个事务中完成
+        with self.conn:
+            if partial:
+                # 只删除修改过的题目的旧记录（走 set_name, question_id 索引）
+                self.conn.executemany("DELETE FROM user_progress WHERE set_name=? AND question_id=?",
+                                      ((set_name, q.id) for q in snapshot[0]))
+            else:
+                self.conn.execute("DELETE FROM user_progress WHERE set_name=?", (set_name,))
+            count = self.conn.executemany(self.INSERT_PROGRESS_SQL, self._progress_rows(snapshot)).rowcount
 
-        # 插入所有题库的数据
-        for set_name, questions in question_manager.question_sets.items():
-            for q in questions:
-                cursor.execute('''
-                               INSERT INTO user_progress
-                                   (question_id, answered, correct, wrong, marked, mastered, set_name)
-                               VALUES (?, ?, ?, ?, ?, ?, ?)
-                               ''', (q['id'], q['answered'], q['correct'], q['wrong'],
-                                     int(q['marked']), int(q['mastered']), set_name))
-                print(
-                    f"保存题目进度: 题库={set_name}, ID={q['id']}, 已答={q['answered']}, 正确={q['correct']}, 错误={q['wrong']}, 标记={q['marked']}, 掌握={q['mastered']}")
-
-        # 保存当前位置
-        cursor.execute('''
-            INSERT OR REPLACE INTO app_state (key, value)
-            VALUES ('last_position', ?)
-        ''', (question_manager.current_question_index,))
-        print(f"保存当前位置: {question_manager.current_question_index}")
+            # 保存当前位置（为每个题库保存独立的位置）
+            self.conn.execute('''
+                INSERT OR REPLACE INTO app_state (key, value)
+                VALUES (?, ?)
+            ''', (f'last_position_{set_name}', current_index))
 
-        # 保存当前题库
-        cursor.execute('''
-            INSERT OR REPLACE INTO app_state (key, value)
-            VALUES ('last_set', ?)
-        ''', (question_manager.current_set,))
-        print(f"保存当前题库: {question_manager.current_set}")
+            # 保存当前题库
+            self.conn.execute('''
+                INSERT OR REPLACE INTO app_state (key, value)
+                VALUES ('last_set', ?)
+            ''', (set_name,))
 
-        self.conn.commit()
-        print("所有进度保存完成")
+        log.debug("进度保存完成: 题库=%s, 共 %s 条记录", set_name, count)
+
+    def save_all_progress(self, question_manager):
+        """保存所有题库的进度，在后台线程写入"""
+        log.debug("保存所有进度: 当前题库=%s, 位置=%s", question_manager.current_set, question_manager.current_question_index)
+        snapshots = []
+        for set_name, questions in question_manager.question_sets.items():
+            progress = question_manager.progress_sets[set_name]
+            progress.take_changes()  # 整体重写，之前记录的修改一并保存
+            snapshots.append(self._progress_snapshot(questions, progress, set_name))
+        return self._submit_write(self._write_all_progress, snapshots,
+                                  question_manager.current_question_index, question_manager.current_set)
+
+    def _write_all_progress(self, snapshots, current_index, current_set):
+        """写入所有题库的进度（在数据库线程中执行）"""
+        rows = itertools.chain.from_iterable(map(self._progress_rows, snapshots))
+        # 清空所有旧数据并批量插入所有题库的数据，在同一个事务中完成
+        with self.conn:
+            self.conn.execute("DELETE FROM user_progress")
+            count = self.conn.executemany(self.INSERT_PROGRESS_SQL, rows).rowcount
+
+            # 保存当前位置
+            self.conn.execute('''
+                INSERT OR REPLACE INTO app_state (key, value)
+                VALUES ('last_position', ?)
+            ''', (current_index,))
+
+            # 保存当前题库
+            self.conn.execute('''
+                INSERT OR REPLACE INTO app_state (key, value)
+                VALUES ('last_set', ?)
+            ''', (current_set,))
+
+        log.debug("所有进度保存完成, 共 %s 条记录", count)
+
+    def load_last_set(self):
+        """读取上次使用的题库名称"""
+        return self._executor.submit(self._read_last_set).result()
+
+    def _read_last_set(self):
+        """读取上次使用的题库名称（在数据库线程中执行）"""
+        row = self.conn.execute("SELECT value FROM app_state WHERE key='last_set'").fetchone()
+        return row[0] if row else None
+
+    def load_state(self, key, default=None):
+        """读取 app_state 中保存的一项界面状态"""
+        return self._executor.submit(self._read_state, key).result() or default
+
+    def _read_state(self, key):
+        """读取一项界面状态（在数据库线程中执行）"""
+        row = self.conn.execute("SELECT value FROM app_state WHERE key=?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def save_state(self, key, value):
+        """保存一项界面状态，在后台线程写入"""
+        return self._submit_write(self._write_state, key, value)
+
+    def _write_state(self, key, value):
+        """写入一项界面状态（在数据库线程中执行）"""
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO app_state (key, value) VALUES (?, ?)", (key, value))
 
     def load_progress(self, set_name):
-        """从数据库加载指定题库的进度"""
-        print(f"加载进度: 题库={set_name}")
+        """从数据库加载指定题库的进度（排在已提交的写入之后执行，读到的总是最新进度）"""
+        return self._executor.submit(self._read_progress, set_name).result()
+
+    def _read_progress(self, set_name):
+        """读取指定题库的进度（在数据库线程中执行）"""
+        log.debug("加载进度: 题库=%s", set_name)
         cursor = self.conn.cursor()
 
         # 加载题目进度
         cursor.execute(
-            "SELECT question_id, answered, correct, wrong, marked, mastered FROM user_progress WHERE set_name=?",
+            "SELECT CAST(question_id AS TEXT), answered, correct, wrong, marked, mastered FROM user_progress WHERE set_name=?",
             (set_name,))
         rows = cursor.fetchall()
-        print(f"加载到 {len(rows)} 条题目进度记录")
+        log.debug("加载到 %s 条题目进度记录", len(rows))
 
         # 加载该题库的最后位置
         cursor.execute("SELECT value FROM app_state WHERE key=?", (f'last_position_{set_name}',))
         row = cursor.fetchone()
         last_position = int(row[0]) if row else 0
-        print(f"加载最后位置: 题库={set_name}, 位置={last_position}")
+        log.debug("加载最后位置: 题库=%s, 位置=%s", set_name, last_position)
 
         # 加载最后题库
         cursor.execute("SELECT value FROM app_state WHERE key='last_set'")
         row = cursor.fetchone()
         last_set = row[0] if row else None
-        print(f"加载最后题库: {last_set}")
+        log.debug("加载最后题库: %s", last_set)
 
         return last_position, last_set, rows
 
     def load_all_progress(self, question_manager):
         """从数据库加载所有题库的进度"""
-        print("加载所有进度...")
+        rows, last_position, last_set = self._executor.submit(self._read_all_progress).result()
+
+        # 按题库分组后更新所有题库的进度
+        rows_by_set = {}
+        for row in rows:
+            rows_by_set.setdefault(row[6], []).append(row[:6])
+        for set_name, set_rows in rows_by_set.items():
+            if set_name in question_manager.question_sets:
+                count = question_manager.apply_progress(set_name, set_rows)
+                log.debug("应用进度: 题库=%s, %s 条记录", set_name, count)
+
+        log.debug("加载完成: 最后位置=%s, 最后题库=%s", last_position, last_set)
+        return last_position, last_set
+
+    def _read_all_progress(self):
+        """读取所有题库的进度（在数据库线程中执行）"""
+        log.debug("加载所有进度...")
         cursor = self.conn.cursor()
 
         # 加载所有题目进度
-        cursor.execute("SELECT question_id, answered, correct, wrong, marked, mastered, set_name FROM user_progress")
+        cursor.execute("SELECT CAST(question_id AS TEXT), answered, correct, wrong, marked, mastered, set_name FROM user_progress")
         rows = cursor.fetchall()
-        print(f"加载到 {len(rows)} 条题目进度记录")
+        log.debug("加载到 %s 条题目进度记录", len(rows))
 
         # 加载最后位置
         cursor.execute("SELECT value FROM app_state WHERE key='last_position'")
         row = cursor.fetchone()
         last_position = int(row[0]) if row else 0
-        print(f"加载最后位置: {last_position}")
+        log.debug("加载最后位置: %s", last_position)
 
         # 加载最后题库
         cursor.execute("SELECT value FROM app_state WHERE key='last_set'")
         row = cursor.fetchone()
         last_set = row[0] if row else None
-        print(f"加载最后题库: {last_set}")
+        log.debug("加载最后题库: %s", last_set)
 
-        # 更新所有题库的进度
-        for row in rows:
-            q_id, answered, correct, wrong, marked, mastered, set_name = row
-            if set_name in question_manager.question_sets:
-                for q in question_manager.question_sets[set_name]:
-                    if q['id'] == q_id:
-                        q['answered'] = answered
-                        q['correct'] = correct
-                        q['wrong'] = wrong
-                        q['marked'] = bool(marked)
-                        q['mastered'] = bool(mastered)
-                        print(
-                            f"应用进度: 题库={set_name}, ID={q_id}, 已答={answered}, 正确={correct}, 错误={wrong}, 标记={marked}, 掌握={mastered}")
-                        break
-
-        print(f"加载完成: 最后位置={last_position}, 最后题库={last_set}")
-        return last_position, last_set
+        return rows, last_position, last_set
+
+
+class WrongQuestionsModel(QAbstractListModel):
+    """错题列表模型，只在视图需要显示某一行时才生成该行文字"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._questions = []
+        self._wrong = None  # 题库的错误次数数组
+
+    def set_questions(self, questions, wrong):
+        """替换错题列表；同一题库答错新题时只插入新增的行，保留滚动位置和选中项"""
+        inserted = None
+        if wrong is self._wrong:
+            inserted = self._inserted_rows(self._questions, questions)
+        if inserted is None:
+            self.beginResetModel()
+            self._questions = questions
+            self._wrong = wrong
+            self.endResetModel()
+            return
+
+        rows = list(self._questions)
+        for row, q in inserted:
+            self.beginInsertRows(QModelIndex(), row, row)
+            rows.insert(row, q)
+            self._questions = rows
+            self.endInsertRows()
+        self._questions = questions
+        # 已有题目的错误次数可能变化，统一通知一次
+        if questions:
+            self.dataChanged.emit(self.index(0), self.index(len(questions) - 1), [Qt.DisplayRole])
+
+    @staticmethod
+    def _inserted_rows(old, new):
+        """旧列表按顺序包含在新列表中时，返回新增的 (行号, 题目)，否则返回 None"""
+        if len(new) < len(old):
+            return None
+        inserted = []
+        j = 0
+        for row, q in enumerate(new):
+            if j < len(old) and old[j] is q:
+                j += 1
+            else:
+                inserted.append((row, q))
+        return inserted if j == len(old) else None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._questions)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        q = self._questions[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{q.id}. {q.content[:50]}... (错误次数: {self._wrong[q.index]})"
+        if role == Qt.UserRole:
+            return q.id
+        return None
 
 
 class AnswerWidget(QWidget):
@@ -395,79 +978,66 @@ class AnswerWidget(QWidget):
         self.layout.setSpacing(15)  # 增加选项间距
         self.button_group = QButtonGroup(self)
         self.button_group.setExclusive(True)
-        self.option_widgets = []
+        self.option_widgets = []  # 当前题目正在使用的选项按钮
         self.is_multiple = False
-        self.original_font = QFont("微软雅黑", 25)  # 保存原始字体，增大字体到25号
+        self._correct = frozenset()  # 当前题目正确答案的选项字母
+        self._highlighted = []  # 已标记为正确答案的按钮
+        self.original_font = FONT_OPTION  # 保存原始字体，增大字体到25号
+
+        # 预先创建单选、多选按钮各4个（对应A-D），切换题目时只更新文字和可见性，不再反复创建销毁
+        self._radios = []
+        self._checkboxes = []
+        for _ in range(4):
+            radio = QRadioButton(self)
+            radio.setAutoExclusive(False)  # 互斥由按钮组控制
+            radio.setFont(self.original_font)
+            # 连接单选按钮的点击信号到答案选择信号
+            radio.toggled.connect(self._on_radio_toggled)
+            radio.setVisible(False)
+            self.layout.addWidget(radio)
+            self._radios.append(radio)
+        for _ in range(4):
+            checkbox = QCheckBox(self)
+            checkbox.setFont(self.original_font)
+            checkbox.setVisible(False)
+            self.layout.addWidget(checkbox)
+            self._checkboxes.append(checkbox)
 
     def set_question(self, question):
         """根据题目类型设置选项"""
-        # 清除旧选项
+        # 取消上一题的选中状态并移出按钮组（取消单选按钮的选中需先关闭互斥）
+        self.button_group.setExclusive(False)
         for widget in self.option_widgets:
-            self.layout.removeWidget(widget)
-            widget.deleteLater()
+            widget.setChecked(False)
+            self.button_group.removeButton(widget)
         self.option_widgets = []
-        self.button_group = QButtonGroup(self)  # 创建新的按钮组
-        self.button_group.setExclusive(not (question['type'] == '多选题'))
-
-        # 判断题目类型
-        self.is_multiple = question['type'] == '多选题'
 
-        # 创建选项按钮
-        options = question['options']
-        for key, text in options.items():
-            if pd.isna(text) or text.strip() == "":
+        # 判断题目类型，并预先取出正确答案的选项字母
+        self.is_multiple = question.type == '多选题'
+        self._correct = frozenset(question.answer)
+        self.button_group.setExclusive(not self.is_multiple)
+
+        # 多选题使用复选框，其他题型使用单选按钮；另一组全部隐藏
+        pool, unused = (self._checkboxes, self._radios) if self.is_multiple else (self._radios, self._checkboxes)
+        for widget in unused:
+            widget.setVisible(False)
+
+        # 设置选项按钮
+        # 按钮外观由窗口主题样式表统一控制（show_question 随后会调用 reset_styles 清除正确答案标记）
+        options = list(question.options.items())
+        for i, widget in enumerate(pool):
+            if i >= len(options):
+                widget.setVisible(False)
+                continue
+            key, text = options[i]
+            if not text.strip():
+                widget.setVisible(False)
                 continue
 
-            if self.is_multiple:
-                checkbox = QCheckBox(f"{key}. {text}")
-                checkbox.setFont(self.original_font)  # 使用原始字体
-                checkbox.setStyleSheet("""
-                    QCheckBox {
-                        padding: 20px;
-                        border: 2px solid #E0E0E0;
-                        border-radius: 10px;
-                        background-color: #FFFFFF;
-                        font-size: 25px;
-                        font-family: "微软雅黑";
-                    }
-                    QCheckBox:hover {
-                        border-color: #4A90E2;
-                        background-color: #F5F9FF;
-                    }
-                    QCheckBox::indicator {
-                        width: 25px;
-                        height: 25px;
-                    }
-                """)
-                self.button_group.addButton(checkbox)
-                self.layout.addWidget(checkbox)
-                self.option_widgets.append(checkbox)
-            else:
-                radio = QRadioButton(f"{key}. {text}")
-                radio.setFont(self.original_font)  # 使用原始字体
-                radio.setStyleSheet("""
-                    QRadioButton {
-                        padding: 20px;
-                        border: 2px solid #E0E0E0;
-                        border-radius: 10px;
-                        background-color: #FFFFFF;
-                        font-size: 25px;
-                        font-family: "微软雅黑";
-                    }
-                    QRadioButton:hover {
-                        border-color: #4A90E2;
-                        background-color: #F5F9FF;
-                    }
-                    QRadioButton::indicator {
-                        width: 25px;
-                        height: 25px;
-                    }
-                """)
-                # 连接单选按钮的点击信号到答案选择信号
-                radio.toggled.connect(self._on_radio_toggled)
-                self.button_group.addButton(radio)
-                self.layout.addWidget(radio)
-                self.option_widgets.append(radio)
+            widget.setText(f"{key}. {text}")
+            self.button_group.addButton(widget)
+            widget.setVisible(True)
+            self.option_widgets.append(widget)
 
         # 不再添加拉伸因子
         # 使用布局对齐方式控制位置
@@ -488,26 +1058,26 @@ class AnswerWidget(QWidget):
                 selected.append(btn.text()[0])
         return ''.join(selected)
 
-    def set_correct_answers(self, correct_answers):
+    @staticmethod
+    def _set_correct_property(btn, correct):
+        """设置按钮的 correct 属性，由主题样式表中的 [correct="true"] 规则放大并标绿"""
+        btn.setProperty('correct', correct)
+        # 属性变化后需要重新应用样式
+        btn.style().unpolish(btn)
+        btn.style().polish(btn)
+
+    def set_correct_answers(self):
         """标记正确答案并放大字体"""
         for btn in self.button_group.buttons():
-            option_key = btn.text()[0]
-            if option_key in correct_answers:
-                # 创建新字体 - 放大正确答案
-                large_font = QFont("Arial", 30)  # 更大的字体
-                large_font.setBold(True)  # 加粗
-                btn.setFont(large_font)
-                btn.setStyleSheet("color: green;")
-            else:
-                # 重置为原始字体
-                btn.setFont(self.original_font)
-                btn.setStyleSheet("")
+            if btn.text()[0] in self._correct:
+                self._set_correct_property(btn, True)
+                self._highlighted.append(btn)
 
     def reset_styles(self):
         """重置按钮样式和字体大小"""
-        for btn in self.button_group.buttons():
-            btn.setFont(self.original_font)  # 重置为原始字体
-            btn.setStyleSheet("")
+        for btn in self._highlighted:
+            self._set_correct_property(btn, False)
+        self._highlighted = []
 
 
 class MainWindow(QMainWindow):
@@ -523,6 +1093,20 @@ class MainWindow(QMainWindow):
         self.question_manager = QuestionManager()
         self.db_manager = DatabaseManager()
 
+        # 自动保存定时器：进度变化后重新计时，1秒内的多次修改只保存一次
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(1000)
+        self._save_timer.timeout.connect(self._flush_save)
+        self._excel_loader = None  # 正在后台解析的题库导入线程
+        self._closing = False  # 窗口已关闭（数据库已关闭），之后送达的解析完成信号不再处理
+        self._wrong_list_dirty = False  # 错题本页面不可见时错题有变化，切换到该页面时再刷新
+        self._explanation_loaded = False  # 解析区域是否已填入当前题目的解析
+        self._pdf_printer = None  # 导出错题PDF用的打印机和文档，第一次导出时创建，之后复用
+        self._pdf_doc = None
+        self._last_progress = None  # 上次显示的进度，进度没变时不重复刷新统计标签和进度条
+        self._theme_palettes = {}  # 主题名称 -> 构造好的 QPalette
+
         # 创建UI
         self.init_ui()
 
@@ -535,10 +1119,17 @@ class MainWindow(QMainWindow):
         self.practice_tab = None  # 初始化 practice_tab
         self.feedback_label = QLabel(self)  # 初始化 feedback_label
         self.feedback_label.setAlignment(Qt.AlignCenter)
-        self.feedback_label.setFont(QFont("微软雅黑", 100))  # 非常大的字体
+        self.feedback_label.setTextFormat(Qt.PlainText)
+        self.feedback_label.setFont(FONT_FEEDBACK)  # 非常大的字体
+        self.feedback_label.setFixedSize(FEEDBACK_SIZE, FEEDBACK_SIZE)
         self.feedback_label.setVisible(False)
         self.feedback_label.setAttribute(Qt.WA_TransparentForMouseEvents)  # 鼠标事件穿透
-        self.feedback_label.setStyleSheet("background: transparent; font-family: 微软雅黑;")
+        # 对号/错号的颜色由 feedback 属性选择，答题时只切换属性，不必重新解析样式表
+        self.feedback_label.setStyleSheet("""
+            QLabel { background: transparent; font-family: 微软雅黑; }
+            QLabel[feedback="correct"] { color: green; }
+            QLabel[feedback="wrong"] { color: red; }
+        """)
         self.initialized = False  # 初始化标志
 
         # 加载题库
@@ -681,6 +1272,7 @@ class MainWindow(QMainWindow):
 
         # 创建统计页面
         self.create_stats_tab()
+        self.tab_widget.currentChanged.connect(self.on_tab_changed)
 
         # 状态栏
         self.status_bar = self.statusBar()
@@ -694,6 +1286,14 @@ class MainWindow(QMainWindow):
         """)
         self.status_bar.showMessage("✅ 就绪 - 欢迎使用刷题大师")
 
+        # 后台解析题库期间在状态栏右侧显示忙碌进度条
+        self.loading_bar = QProgressBar()
+        self.loading_bar.setRange(0, 0)
+        self.loading_bar.setMaximumWidth(150)
+        self.loading_bar.setMaximumHeight(12)
+        self.loading_bar.setVisible(False)
+        self.status_bar.addPermanentWidget(self.loading_bar)
+
     def create_practice_tab(self):
         """创建答题页面"""
         tab = QWidget()
@@ -706,7 +1306,7 @@ class MainWindow(QMainWindow):
         self.question_label = QLabel()
         self.question_label.setWordWrap(True)
         self.question_label.setAlignment(Qt.AlignCenter)
-        self.question_label.setFont(QFont("微软雅黑", 25, QFont.Bold))
+        self.question_label.setFont(FONT_QUESTION)
         self.question_label.setStyleSheet("""
             QLabel {
                 padding: 20px;
@@ -736,7 +1336,7 @@ class MainWindow(QMainWindow):
         # 解析区域
         self.explanation_browser = QTextBrowser()
         self.explanation_browser.setVisible(False)
-        self.explanation_browser.setFont(QFont("微软雅黑", 14))
+        self.explanation_browser.setFont(FONT_TEXT)
         self.explanation_browser.setStyleSheet("""
             QTextBrowser {
                 padding: 15px;
@@ -842,7 +1442,7 @@ class MainWindow(QMainWindow):
                 width: 20px;
             }
         """)
-        self.progress_bar.setFont(QFont("微软雅黑", 15, QFont.Bold))  # 将字体大小从12改为15
+        self.progress_bar.setFont(FONT_PROGRESS)  # 将字体大小从12改为15
         layout.addWidget(self.progress_bar)
 
         # 统计信息 - 减小高度
@@ -857,20 +1457,23 @@ class MainWindow(QMainWindow):
 
         stat_labels = [self.total_label, self.answered_label, self.correct_label, 
                       self.mastered_label, self.unmastered_label]
-        
+
+        # 统计标签的样式写在页面的样式表中，只解析一次，标签通过 stat 属性匹配
+        tab.setStyleSheet("""
+            QLabel[stat="true"] {
+                padding: 5px;
+                border-radius: 8px;
+                font-size: 15px;  /* 将字体大小从12px改为15px */
+                font-weight: bold;
+                background-color: #E3F2FD;
+                color: #1976D2;
+                text-align: center;
+                font-family: "微软雅黑";
+            }
+        """)
         for label in stat_labels:
-            label.setStyleSheet("""
-                QLabel {
-                    padding: 5px;
-                    border-radius: 8px;
-                    font-size: 15px;  /* 将字体大小从12px改为15px */
-                    font-weight: bold;
-                    background-color: #E3F2FD;
-                    color: #1976D2;
-                    text-align: center;
-                    font-family: "微软雅黑";
-                }
-            """)
+            label.setProperty('stat', True)
+            label.setTextFormat(Qt.PlainText)  # 只显示数字，不必每次检测是否为富文本
             label.setAlignment(Qt.AlignCenter)
             # 减小标签高度
             label.setFixedHeight(40)
@@ -884,15 +1487,6 @@ class MainWindow(QMainWindow):
 
         layout.addLayout(stats_layout)
 
-        # 创建悬浮反馈标签（不参与布局）
-        self.feedback_label = QLabel(tab)  # 使用答题练习标签页作为父控件
-        self.feedback_label.setAlignment(Qt.AlignCenter)
-        self.feedback_label.setFont(QFont("微软雅黑", 100, QFont.Bold))  # 非常大的字体
-        self.feedback_label.setVisible(False)
-        self.feedback_label.setAttribute(Qt.WA_TransparentForMouseEvents)  # 鼠标事件穿透
-        self.feedback_label.setStyleSheet("background: transparent; font-family: 微软雅黑;")  # 背景透明
-        self.feedback_label.setFixedSize(200, 200)  # 预设大小
-
         self.tab_widget.addTab(tab, "📖 答题练习")
 
     def create_wrong_questions_tab(self):
@@ -917,12 +1511,17 @@ class MainWindow(QMainWindow):
         layout.addWidget(title_label)
 
         # 错题列表
-        self.wrong_list = QListWidget()
+        # 使用模型/视图，只为可见的行生成显示内容
+        self.wrong_model = WrongQuestionsModel(self)
+        self.wrong_list = QListView()
+        self.wrong_list.setModel(self.wrong_model)
+        self.wrong_list.setUniformItemSizes(True)
+        self.wrong_list.setLayoutMode(QListView.Batched)
         self.wrong_list.setSelectionMode(QAbstractItemView.SingleSelection)
-        self.wrong_list.itemDoubleClicked.connect(self.open_wrong_question)
-        self.wrong_list.setFont(QFont("微软雅黑", 14))
+        self.wrong_list.doubleClicked.connect(self.open_wrong_question)
+        self.wrong_list.setFont(FONT_TEXT)
         self.wrong_list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 border: 2px solid #FFCDD2;
                 border-radius: 10px;
                 padding: 10px;
@@ -931,11 +1530,11 @@ class MainWindow(QMainWindow):
                 font-family: "微软雅黑";
                 font-size: 14px;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 10px;
                 border-bottom: 1px solid #EEEEEE;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #FFCDD2;
                 color: #B71C1C;
                 border-radius: 5px;
@@ -1009,6 +1608,7 @@ class MainWindow(QMainWindow):
         # 总体统计
         stats_frame = QFrame()
         stats_frame.setFrameShape(QFrame.StyledPanel)
+        # 统计标签的样式也写在这里，只解析一次，标签通过 stat 属性匹配
         stats_frame.setStyleSheet("""
             QFrame {
                 border: 2px solid #1976D2;
@@ -1016,6 +1616,15 @@ class MainWindow(QMainWindow):
                 padding: 20px;
                 background-color: #FFFFFF;
             }
+            QLabel[stat="true"] {
+                padding: 12px;
+                border-radius: 8px;
+                font-size: 16px;
+                font-weight: bold;
+                background-color: #F5F5F5;
+                color: #333333;
+                font-family: "微软雅黑";
+            }
         """)
         stats_layout = QVBoxLayout(stats_frame)
         stats_layout.setSpacing(15)
@@ -1048,18 +1657,8 @@ class MainWindow(QMainWindow):
                       self.stats_accuracy]
         
         for label in stat_labels:
-            label.setStyleSheet("""
-                QLabel {
-                    padding: 12px;
-                    border-radius: 8px;
-                    font-size: 16px;
-                    font-weight: bold;
-                    background-color: #F5F5F5;
-                    color: #333333;
-                    font-family: "微软雅黑";
-                }
-            """)
-            label.setFont(QFont("微软雅黑", 14))
+            label.setProperty('stat', True)
+            label.setTextFormat(Qt.PlainText)  # 只显示数字，不必每次检测是否为富文本
 
         stats_layout.addWidget(self.stats_total)
         stats_layout.addWidget(self.stats_answered)
@@ -1090,198 +1689,184 @@ class MainWindow(QMainWindow):
         self.tab_widget.addTab(tab, "📈 学习统计")
 
     def load_question_sets(self):
-        """加载题库"""
+        """加载题库（在后台线程解析，窗口可以先显示出来）"""
+        log.debug("开始加载题库...")
+        # 扫描当前目录下名称包含"题库"的Excel文件
+        question_files = glob.glob(os.path.join(os.getcwd(), "*题库*.xlsx"))
+        question_files.extend(glob.glob(os.path.join(os.getcwd(), "*题库*.xls")))
+
+        if not question_files:
+            self.status_bar.showMessage("未找到题库文件，请导入题库")
+            log.debug("未找到题库文件")
+            return
+
+        log.debug("找到 %s 个题库文件", len(question_files))
+
+        # 解析期间禁用界面操作，全部解析完后再应用进度、显示题目
+        self.centralWidget().setEnabled(False)
+        self.status_bar.showMessage("正在加载题库...")
+        self.loading_bar.setVisible(True)
+        self._excel_loader = ExcelLoader(question_files, self)
+        self._excel_loader.finished.connect(self.on_question_sets_loaded)
+        self._excel_loader.finished.connect(self._excel_loader.deleteLater)
+        self._excel_loader.start()
+
+    def on_question_sets_loaded(self):
+        """启动时所有题库解析完成，登记题库并恢复上次的题库和进度"""
+        if self._closing:
+            return
+        results = self._excel_loader.results
+        self._excel_loader = None
+        self.loading_bar.setVisible(False)
+        self.centralWidget().setEnabled(True)
         try:
-            print("开始加载题库...")
-            # 扫描当前目录下名称包含"题库"的Excel文件
-            question_files = glob.glob(os.path.join(os.getcwd(), "*题库*.xlsx"))
-            question_files.extend(glob.glob(os.path.join(os.getcwd(), "*题库*.xls")))
-
-            if not question_files:
-                self.status_bar.showMessage("未找到题库文件，请导入题库")
-                print("未找到题库文件")
-                return
-
-            print(f"找到 {len(question_files)} 个题库文件")
-
-            # 加载所有题库文件
-            for file_path in question_files:
-                print(f"加载题库文件: {file_path}")
-                success, message = self.question_manager.load_from_excel(file_path)
-                if success:
-                    self.status_bar.showMessage(message)
-                    print(message)
-                else:
+            for file_path, questions, message in results:
+                log.debug("加载题库文件: %s", file_path)
+                if questions is None:
                     QMessageBox.warning(self, "加载失败", message)
-                    print(f"加载失败: {message}")
+                    log.warning("加载失败: %s", message)
+                    continue
+                self.question_manager.add_question_set(file_path, questions)
+                log.debug("%s", message)
 
-            # 更新题库选择下拉框
+            # 更新题库选择下拉框（下面会手动切换到要显示的题库，填充期间不触发 change_question_set）
+            self.set_combo.blockSignals(True)
             self.set_combo.clear()
             self.set_combo.addItems(self.question_manager.question_sets.keys())
-            print(f"更新题库选择下拉框: {len(self.question_manager.question_sets)} 个题库")
+            self.set_combo.blockSignals(False)
+            log.debug("更新题库选择下拉框: %s 个题库", len(self.question_manager.question_sets))
 
             # 尝试加载上次使用的题库
-            print("尝试加载上次使用的题库...")
+            log.debug("尝试加载上次使用的题库...")
             # 先获取上次使用的题库名称
-            cursor = self.db_manager.conn.cursor()
-            cursor.execute("SELECT value FROM app_state WHERE key='last_set'")
-            row = cursor.fetchone()
-            last_set = row[0] if row else None
+            last_set = self.db_manager.load_last_set()
             
             if last_set and last_set in self.question_manager.question_sets:
-                print(f"找到上次使用的题库: {last_set}")
+                log.debug("找到上次使用的题库: %s", last_set)
                 self.question_manager.set_current_set(last_set)
+                self.set_combo.blockSignals(True)
                 self.set_combo.setCurrentText(last_set)
+                self.set_combo.blockSignals(False)
                 
                 # 加载该题库的进度和位置
                 last_position, _, progress_rows = self.db_manager.load_progress(last_set)
                 
                 # 应用进度到当前题库
                 if progress_rows:
-                    print(f"应用进度到题库: {len(progress_rows)} 条记录")
-                    # 创建题目ID到题目的映射
-                    id_to_question = {q['id']: q for q in self.question_manager.questions}
-
-                    # 应用进度
-                    for row in progress_rows:
-                        q_id, answered, correct, wrong, marked, mastered = row
-                        if q_id in id_to_question:
-                            q = id_to_question[q_id]
-                            q['answered'] = answered
-                            q['correct'] = correct
-                            q['wrong'] = wrong
-                            q['marked'] = bool(marked)
-                            q['mastered'] = bool(mastered)
-                            print(
-                                f"应用进度: 题目ID={q_id}, 已答={answered}, 正确={correct}, 错误={wrong}, 标记={marked}, 掌握={mastered}")
-                
+                    count = self.question_manager.apply_progress(last_set, progress_rows)
+                    log.debug("应用进度到题库: %s 条记录", count)
+
                 # 设置该题库的当前位置
                 self.question_manager.current_question_index = last_position
-                print(f"设置题库 {last_set} 的位置: {last_position}")
+                log.debug("设置题库 %s 的位置: %s", last_set, last_position)
             else:
                 # 默认选择第一个题库
                 if self.question_manager.question_sets:
                     first_set = list(self.question_manager.question_sets.keys())[0]
-                    print(f"未找到上次使用的题库，默认选择第一个题库: {first_set}")
+                    log.debug("未找到上次使用的题库，默认选择第一个题库: %s", first_set)
                     self.question_manager.set_current_set(first_set)
+                    self.set_combo.blockSignals(True)
                     self.set_combo.setCurrentText(first_set)
+                    self.set_combo.blockSignals(False)
                     
                     # 加载默认题库的进度和位置
                     last_position, _, progress_rows = self.db_manager.load_progress(first_set)
                     
                     # 应用进度到当前题库
                     if progress_rows:
-                        print(f"应用进度到题库: {len(progress_rows)} 条记录")
-                        # 创建题目ID到题目的映射
-                        id_to_question = {q['id']: q for q in self.question_manager.questions}
-
-                        # 应用进度
-                        for row in progress_rows:
-                            q_id, answered, correct, wrong, marked, mastered = row
-                            if q_id in id_to_question:
-                                q = id_to_question[q_id]
-                                q['answered'] = answered
-                                q['correct'] = correct
-                                q['wrong'] = wrong
-                                q['marked'] = bool(marked)
-                                q['mastered'] = bool(mastered)
-                                print(
-                                    f"应用进度: 题目ID={q_id}, 已答={answered}, 正确={correct}, 错误={wrong}, 标记={marked}, 掌握={mastered}")
-                    
+                        count = self.question_manager.apply_progress(first_set, progress_rows)
+                        log.debug("应用进度到题库: %s 条记录", count)
+
                     # 设置该题库的当前位置
                     self.question_manager.current_question_index = last_position
-                    print(f"设置题库 {first_set} 的位置: {last_position}")
+                    log.debug("设置题库 %s 的位置: %s", first_set, last_position)
 
             # 显示该题库的当前位置题目
-            print("显示当前位置题目...")
+            log.debug("显示当前位置题目...")
             self.show_question()
             self.update_progress()
             self.status_bar.showMessage("题库加载完成")
-            print("题库加载完成")
+            log.debug("题库加载完成")
 
             # 刷新错题列表
-            print("刷新错题列表...")
-            self.refresh_wrong_list()
+            log.debug("刷新错题列表...")
+            self.invalidate_wrong_list()
 
             # 标记为已初始化
             self.initialized = True
-            print("初始化完成")
+            log.debug("初始化完成")
         except Exception as e:
             QMessageBox.critical(self, "加载题库失败", str(e))
-            print(f"加载题库失败: {str(e)}")
-            traceback.print_exc()
+            log.exception("加载题库失败: %s", e)
 
     def show_first_unmastered_question(self):
         """显示第一个未掌握的题目"""
-        # 找到第一个未掌握的题目
-        for i in range(len(self.question_manager.questions)):
-            if not self.question_manager.questions[i]['mastered']:
-                self.question_manager.current_question_index = i
-                break
+        # 找到第一个未掌握的题目（全部已掌握时保持当前位置）
+        index = self.question_manager.first_unmastered_index()
+        if index is not None:
+            self.question_manager.current_question_index = index
         self.show_question()
 
     def change_question_set(self, index):
         """切换题库"""
         set_name = self.set_combo.currentText()
         if set_name and set_name in self.question_manager.question_sets:
-            print(f"开始切换题库: {set_name}")
+            log.debug("开始切换题库: %s", set_name)
 
             # 保存当前题库进度
-            print("保存当前题库进度...")
+            log.debug("保存当前题库进度...")
             self.save_current_progress()
 
             # 切换到新题库
-            print(f"切换到新题库: {set_name}")
+            log.debug("切换到新题库: %s", set_name)
             self.question_manager.set_current_set(set_name)
 
             # 加载新题库的进度和位置
-            print("加载新题库进度...")
+            log.debug("加载新题库进度...")
             last_position, _, progress_rows = self.db_manager.load_progress(set_name)
             if progress_rows:
-                print(f"应用进度到新题库: {len(progress_rows)} 条记录")
-                # 创建题目ID到题目的映射
-                id_to_question = {q['id']: q for q in self.question_manager.questions}
-
-                # 应用进度
-                for row in progress_rows:
-                    q_id, answered, correct, wrong, marked, mastered = row
-                    if q_id in id_to_question:
-                        q = id_to_question[q_id]
-                        q['answered'] = answered
-                        q['correct'] = correct
-                        q['wrong'] = wrong
-                        q['marked'] = bool(marked)
-                        q['mastered'] = bool(mastered)
-                        print(
-                            f"应用进度: 题目ID={q_id}, 已答={answered}, 正确={correct}, 错误={wrong}, 标记={marked}, 掌握={mastered}")
+                count = self.question_manager.apply_progress(set_name, progress_rows)
+                log.debug("应用进度到新题库: %s 条记录", count)
 
             # 设置新题库的当前位置
             self.question_manager.current_question_index = last_position
-            print(f"设置题库 {set_name} 的位置: {last_position}")
+            log.debug("设置题库 %s 的位置: %s", set_name, last_position)
 
             # 显示该题库的当前位置题目
-            print("显示当前位置题目...")
+            log.debug("显示当前位置题目...")
             self.show_question()
             self.update_progress()
             self.status_bar.showMessage(f"已切换到题库: {set_name}")
 
             # 刷新错题列表
-            print("刷新错题列表...")
-            self.refresh_wrong_list()
-            print(f"题库切换完成: {set_name}")
+            log.debug("刷新错题列表...")
+            self.invalidate_wrong_list()
+            log.debug("题库切换完成: %s", set_name)
+
+    def schedule_save(self):
+        """标记进度已修改，延迟自动保存"""
+        self._save_timer.start()
+
+    def _flush_save(self):
+        """自动保存定时器到期时保存进度"""
+        self.save_current_progress()
 
     def save_current_progress(self):
         """保存当前题库进度"""
+        # 立即保存时取消尚未触发的自动保存
+        self._save_timer.stop()
         if self.initialized and self.question_manager.current_set and self.question_manager.questions:
-            print(f"开始保存当前题库进度: {self.question_manager.current_set}")
+            log.debug("开始保存当前题库进度: %s", self.question_manager.current_set)
+            # 进度按整个题库保存（练习错题时 questions 只是其中一部分）
             self.db_manager.save_progress(
-                self.question_manager.questions,
+                self.question_manager.question_sets[self.question_manager.current_set],
+                self.question_manager.progress,
                 self.question_manager.current_question_index,
                 self.question_manager.current_set
             )
-            print(f"当前题库进度保存完成: {self.question_manager.current_set}")
+            log.debug("当前题库进度保存完成: %s", self.question_manager.current_set)
         else:
-            print("跳过保存进度: 未初始化或无题库")
+            log.debug("跳过保存进度: 未初始化或无题库")
 
     def show_question(self):
         """显示当前题目"""
@@ -1289,28 +1874,19 @@ class MainWindow(QMainWindow):
         if not question:
             return
 
-        # 设置题目内容：第一行显示题型，第二行显示题号和内容（题号用不同颜色）
-        q_text = f'<div style="text-align: center;">' \
-                 f'<div style="font-size: 25px; color: #1976D2; font-weight: bold; font-family: 微软雅黑;">【{question["type"]}】</div>' \
-                 f'<div><span style="color: #F44336; font-weight: bold; font-family: 微软雅黑;">{question["id"]}.</span> <span style="font-family: 微软雅黑;">{question["content"]}</span></div>' \
-                 f'</div>'
-        self.question_label.setText(q_text)
-        self.question_label.setFont(QFont("微软雅黑", 25, QFont.Bold))
+        # 设置题目内容
+        self.question_label.setText(QUESTION_HTML.format(type=question.type, id=question.id, content=question.content))
 
         # 设置答案选项
         self.answer_widget.set_question(question)
 
-        # 重置解析区域
-        explanation_html = f'<div style="font-family: 微软雅黑; font-size: 16px;">' \
-                          f'<h3 style="color: #FF9800; margin-top: 0; font-family: 微软雅黑;">题目解析</h3>' \
-                          f'<p style="font-family: 微软雅黑;">{question["explanation"]}</p>' \
-                          f'</div>'
-        self.explanation_browser.setHtml(explanation_html)
+        # 重置解析区域（解析默认隐藏，点击显示解析时才生成内容）
+        self._explanation_loaded = False
         self.explanation_browser.setVisible(False)
         self.show_explanation_btn.setText("📘 显示解析")
 
         # 更新标记按钮状态
-        self.mark_btn.setChecked(question['marked'])
+        self.mark_btn.setChecked(bool(self.question_manager.progress.marked[question.index]))
 
         # 更新导航按钮状态
         self.prev_btn.setEnabled(self.question_manager.prev_question_exists())
@@ -1333,20 +1909,20 @@ class MainWindow(QMainWindow):
             return
 
         # 只对单选题和判断题自动提交
-        if question['type'] in ['单选题', '判断题']:
+        if question.type in ['单选题', '判断题']:
             # 延迟一小段时间后提交，确保UI更新完成
             QTimer.singleShot(200, self.submit_answer)
 
     def submit_answer(self):
         """提交答案并检查"""
-        print("提交答案按钮被点击")
+        log.debug("提交答案按钮被点击")
         if self.showing_answer:
-            print("当前正在显示答案，不处理")
+            log.debug("当前正在显示答案，不处理")
             return
 
         question = self.question_manager.get_current_question()
         if not question:
-            print("没有当前题目")
+            log.debug("没有当前题目")
             return
 
         selected = self.answer_widget.get_selected_answers()
@@ -1354,30 +1930,29 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "未选择答案", "请先选择一个答案再提交！")
             return
 
-        print(f"选择的答案: {selected}, 正确答案: {question['answer']}")
+        log.debug("选择的答案: %s, 正确答案: %s", selected, question.answer)
 
         # 检查答案
-        is_correct = selected == question['answer']
+        is_correct = selected == question.answer
 
         # 记录答题结果
         self.question_manager.record_answer(is_correct)
+        self.schedule_save()
 
         # 显示正确答案
-        self.answer_widget.set_correct_answers(question['answer'])
+        self.answer_widget.set_correct_answers()
 
         # 显示结果消息
         if is_correct:
             self.status_bar.showMessage("回答正确！")
             # 显示对号
             if self.feedback_label:  # 确保反馈标签存在
-                self.feedback_label.setText("✓")
-                self.feedback_label.setStyleSheet("color: green; background: transparent;")
+                self.set_feedback("✓", 'correct')
         else:
-            self.status_bar.showMessage(f"回答错误！正确答案: {question['answer']}")
+            self.status_bar.showMessage(f"回答错误！正确答案: {question.answer}")
             # 显示错号
             if self.feedback_label:  # 确保反馈标签存在
-                self.feedback_label.setText("✗")
-                self.feedback_label.setStyleSheet("color: red; background: transparent;")
+                self.set_feedback("✗", 'wrong')
 
         # 调整反馈标签位置并显示
         if self.feedback_label:  # 确保反馈标签存在
@@ -1389,7 +1964,7 @@ class MainWindow(QMainWindow):
         self.update_progress()
 
         # 刷新错题列表
-        self.refresh_wrong_list()
+        self.invalidate_wrong_list()
 
         # 禁用提交按钮
         self.submit_btn.setEnabled(False)
@@ -1410,37 +1985,39 @@ class MainWindow(QMainWindow):
         else:
             # 已经是最后一题，重置进度（除了已掌握的题目）
             self.question_manager.reset_progress(exclude_mastered=True)
+            self.schedule_save()
             self.show_first_unmastered_question()
             self.update_progress()
             self.status_bar.showMessage("已重置进度（已掌握题目除外），开始新一轮答题")
 
             # 刷新错题列表
-            self.refresh_wrong_list()
+            self.invalidate_wrong_list()
 
     def hide_feedback(self):
         """隐藏反馈标签"""
         if self.feedback_label:  # 确保反馈标签存在
             self.feedback_label.setVisible(False)
 
+    def set_feedback(self, symbol, result):
+        """设置反馈标签的符号，颜色由标签样式表中的 [feedback=...] 规则决定"""
+        label = self.feedback_label
+        label.setText(symbol)
+        if label.property('feedback') != result:
+            label.setProperty('feedback', result)
+            # 属性变化后需要重新应用样式
+            label.style().unpolish(label)
+            label.style().polish(label)
+
     def adjust_feedback_label_position(self):
         """调整反馈标签位置到中央"""
         if not self.feedback_label:  # 添加检查
             return
 
-        # 获取答题练习标签页的中央位置
-        if self.practice_tab:  # 确保练习标签页存在
-            # 获取练习标签页在窗口中的位置
-            center = self.practice_tab.rect().center()
-            size = 200
-            self.feedback_label.setFixedSize(size, size)
-            # 相对于练习标签页移动标签到中央
-            self.feedback_label.move(center.x() - size // 2, center.y() - size // 2)
-        else:
-            # 备用方案：使用主窗口中央位置
-            center = self.rect().center()
-            size = 200
-            self.feedback_label.setFixedSize(size, size)
-            self.feedback_label.move(center.x() - size // 2, center.y() - size // 2)
+        # 获取答题练习标签页的中央位置（练习标签页不存在时使用主窗口中央位置）
+        # 标签大小在创建时已固定，这里只需移动
+        center = (self.practice_tab or self).rect().center()
+        half = FEEDBACK_SIZE // 2
+        self.feedback_label.move(center.x() - half, center.y() - half)
 
     def resizeEvent(self, event):
         """窗口大小改变时调整反馈标签位置"""
@@ -1456,6 +2033,11 @@ class MainWindow(QMainWindow):
     def toggle_explanation(self):
         """切换解析显示"""
         visible = not self.explanation_browser.isVisible()
+        if visible and not self._explanation_loaded:
+            question = self.question_manager.get_current_question()
+            if question:
+                self.explanation_browser.setHtml(EXPLANATION_HTML.format(explanation=question.explanation))
+                self._explanation_loaded = True
         self.explanation_browser.setVisible(visible)
         self.show_explanation_btn.setText("隐藏解析" if visible else "显示解析")
 
@@ -1463,15 +2045,21 @@ class MainWindow(QMainWindow):
         """标记/取消标记题目"""
         question = self.question_manager.get_current_question()
         if question:
-            question['marked'] = self.mark_btn.isChecked()
-            if question['marked']:
+            marked = self.mark_btn.isChecked()
+            self.question_manager.set_marked(question, marked)
+            self.schedule_save()
+            if marked:
                 self.status_bar.showMessage("题目已标记")
             else:
                 self.status_bar.showMessage("题目取消标记")
 
     def update_progress(self):
         """更新进度信息"""
-        total, answered, correct, mastered, unmastered = self.question_manager.get_progress()
+        progress = self.question_manager.get_progress()
+        if progress == self._last_progress:
+            return
+        self._last_progress = progress
+        total, answered, correct, mastered, unmastered = progress
 
         # 更新答题页面统计
         self.total_label.setText(f"总题数: {total}")
@@ -1496,26 +2084,33 @@ class MainWindow(QMainWindow):
         progress = (answered / total * 100) if total > 0 else 0
         self.progress_bar.setValue(int(progress))
 
+    def on_tab_changed(self, index):
+        """切换到错题本页面时刷新过期的错题列表"""
+        if index == 1 and self._wrong_list_dirty:
+            self.refresh_wrong_list()
+
+    def invalidate_wrong_list(self):
+        """错题可能有变化：错题本页面可见时立即刷新，否则等切换到该页面时再刷新"""
+        if self.tab_widget.currentIndex() == 1:
+            self.refresh_wrong_list()
+        else:
+            self._wrong_list_dirty = True
+
     def refresh_wrong_list(self):
         """刷新错题列表"""
-        self.wrong_list.clear()
-        wrong_questions = self.question_manager.get_wrong_questions()
-
-        for q in wrong_questions:
-            item = QListWidgetItem(f"{q['id']}. {q['content'][:50]}... (错误次数: {q['wrong']})")
-            item.setData(Qt.UserRole, q['id'])
-            self.wrong_list.addItem(item)
+        self._wrong_list_dirty = False
+        self.wrong_model.set_questions(self.question_manager.get_wrong_questions(),
+                                       self.question_manager.progress.wrong)
 
-    def open_wrong_question(self, item):
+    def open_wrong_question(self, index):
         """打开选中的错题"""
-        q_id = item.data(Qt.UserRole)
+        q_id = index.data(Qt.UserRole)
         # 找到题目索引
-        for idx, q in enumerate(self.question_manager.questions):
-            if q['id'] == q_id:
-                self.question_manager.current_question_index = idx
-                self.tab_widget.setCurrentIndex(0)  # 切换到答题页
-                self.show_question()
-                break
+        entry = self.question_manager.by_id.get(q_id)
+        if entry is not None:
+            self.question_manager.current_question_index = entry[0]
+            self.tab_widget.setCurrentIndex(0)  # 切换到答题页
+            self.show_question()
 
     def practice_wrong_questions(self):
         """练习错题"""
@@ -1545,185 +2140,83 @@ class MainWindow(QMainWindow):
         else:
             self.apply_light_theme()
 
+    def theme_palette(self, name, colors):
+        """主题调色板只在第一次使用时构造，之后直接复用"""
+        palette = self._theme_palettes.get(name)
+        if palette is None:
+            palette = self.palette()
+            for role, color in colors:
+                palette.setColor(role, color)
+            self._theme_palettes[name] = palette
+        return palette
+
     def apply_light_theme(self):
         """应用浅色主题"""
-        palette = self.palette()
-        # 使用 QPalette.ColorRole 枚举
-        palette.setColor(QPalette.ColorRole.Window, QColor(245, 245, 245))
-        palette.setColor(QPalette.ColorRole.WindowText, Qt.GlobalColor.black)
-        palette.setColor(QPalette.ColorRole.Base, QColor(255, 255, 255))
-        palette.setColor(QPalette.ColorRole.AlternateBase, QColor(240, 240, 240))
-        palette.setColor(QPalette.ColorRole.ToolTipBase, Qt.GlobalColor.white)
-        palette.setColor(QPalette.ColorRole.ToolTipText, Qt.GlobalColor.black)
-        palette.setColor(QPalette.ColorRole.Text, Qt.GlobalColor.black)
-        palette.setColor(QPalette.ColorRole.Button, QColor(248, 248, 248))
-        palette.setColor(QPalette.ColorRole.ButtonText, Qt.GlobalColor.black)
-        palette.setColor(QPalette.ColorRole.BrightText, Qt.GlobalColor.red)
-        palette.setColor(QPalette.ColorRole.Highlight, QColor(74, 144, 226))
-        palette.setColor(QPalette.ColorRole.HighlightedText, Qt.GlobalColor.white)
-        self.setPalette(palette)
-
-        # 额外样式
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #F5F5F5;
-                font-family: "微软雅黑";
-            }
-            QTabWidget::pane { 
-                border: 2px solid #CCCCCC; 
-                border-top: none;
-                border-radius: 8px;
-                background-color: white;
-                padding: 10px;
-                font-family: "微软雅黑";
-            }
-            QTabBar::tab { 
-                background: #E0E0E0; 
-                padding: 12px 25px; 
-                border: 2px solid #CCCCCC; 
-                border-bottom: none; 
-                border-top-left-radius: 8px; 
-                border-top-right-radius: 8px;
-                font-size: 14px;
-                font-weight: bold;
-                font-family: "微软雅黑";
-            }
-            QTabBar::tab:selected { 
-                background: #4A90E2; 
-                color: white;
-                border-color: #4A90E2;
-            }
-            QFrame { 
-                background: white; 
-                border-radius: 8px;
-            }
-            QLabel, QRadioButton, QCheckBox, QTextBrowser { 
-                color: #333333; 
-                font-family: "微软雅黑";
-            }
-            QComboBox {
-                padding: 8px 15px;
-                border-radius: 5px;
-                border: 2px solid #CCCCCC;
-                background-color: white;
-                font-family: "微软雅黑";
-            }
-            QComboBox:hover {
-                border-color: #4A90E2;
-            }
-            QComboBox::drop-down {
-                border-left: 2px solid #CCCCCC;
-            }
-            QPushButton {
-                font-family: "微软雅黑";
-            }
-            QProgressBar {
-                font-family: "微软雅黑";
-            }
-        """)
+        self.setPalette(self.theme_palette('light', LIGHT_PALETTE_COLORS))
+        self.setStyleSheet(LIGHT_STYLE)
 
     def apply_dark_theme(self):
         """应用深色主题"""
-        palette = self.palette()
-        # 使用 QPalette.ColorRole 枚举
-        palette.setColor(QPalette.ColorRole.Window, QColor(40, 40, 40))
-        palette.setColor(QPalette.ColorRole.WindowText, Qt.GlobalColor.white)
-        palette.setColor(QPalette.ColorRole.Base, QColor(30, 30, 30))
-        palette.setColor(QPalette.ColorRole.AlternateBase, QColor(45, 45, 45))
-        palette.setColor(QPalette.ColorRole.ToolTipBase, QColor(25, 25, 25))
-        palette.setColor(QPalette.ColorRole.ToolTipText, Qt.GlobalColor.white)
-        palette.setColor(QPalette.ColorRole.Text, Qt.GlobalColor.white)
-        palette.setColor(QPalette.ColorRole.Button, QColor(50, 50, 50))
-        palette.setColor(QPalette.ColorRole.ButtonText, Qt.GlobalColor.white)
-        palette.setColor(QPalette.ColorRole.BrightText, Qt.GlobalColor.red)
-        palette.setColor(QPalette.ColorRole.Highlight, QColor(74, 144, 226))
-        palette.setColor(QPalette.ColorRole.HighlightedText, Qt.GlobalColor.white)
-        self.setPalette(palette)
-
-        # 额外样式
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #282828;
-                font-family: "微软雅黑";
-            }
-            QTabWidget::pane { 
-                border: 2px solid #555555; 
-                border-top: none;
-                border-radius: 8px;
-                background-color: #333333;
-                padding: 10px;
-                font-family: "微软雅黑";
-            }
-            QTabBar::tab { 
-                background: #444444; 
-                color: #CCCCCC;
-                padding: 12px 25px; 
-                border: 2px solid #555555; 
-                border-bottom: none; 
-                border-top-left-radius: 8px; 
-                border-top-right-radius: 8px;
-                font-size: 14px;
-                font-weight: bold;
-                font-family: "微软雅黑";
-            }
-            QTabBar::tab:selected { 
-                background: #4A90E2; 
-                color: white;
-                border-color: #4A90E2;
-            }
-            QFrame { 
-                background: #333333; 
-                border-radius: 8px;
-            }
-            QLabel, QRadioButton, QCheckBox, QTextBrowser { 
-                color: #EEEEEE; 
-                font-family: "微软雅黑";
-            }
-            QComboBox {
-                padding: 8px 15px;
-                border-radius: 5px;
-                border: 2px solid #555555;
-                background-color: #333333;
-                color: #EEEEEE;
-                font-family: "微软雅黑";
-            }
-            QComboBox:hover {
-                border-color: #4A90E2;
-            }
-            QComboBox::drop-down {
-                border-left: 2px solid #555555;
-            }
-            QPushButton {
-                font-family: "微软雅黑";
-            }
-            QProgressBar {
-                font-family: "微软雅黑";
-            }
-        """)
+        self.setPalette(self.theme_palette('dark', DARK_PALETTE_COLORS))
+        self.setStyleSheet(DARK_STYLE)
 
     def import_questions(self):
         """导入题库"""
+        # 从上次导入的目录打开
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "选择题库文件", "", "Excel文件 (*.xlsx *.xls)"
+            self, "选择题库文件", self.db_manager.load_state('last_import_dir', ""), "Excel文件 (*.xlsx *.xls)"
         )
 
         if file_path:
-            success, message = self.question_manager.load_from_excel(file_path)
-            if success:
-                # 更新题库选择下拉框
-                self.set_combo.clear()
-                self.set_combo.addItems(self.question_manager.question_sets.keys())
-                self.set_combo.setCurrentText(self.question_manager.current_set)
-
-                # 显示第一题（跳过已掌握的题目）
-                self.show_first_unmastered_question()
-                self.update_progress()
-                self.status_bar.showMessage(message)
-
-                # 刷新错题列表
-                self.refresh_wrong_list()
-            else:
-                QMessageBox.critical(self, "导入失败", message)
+            self.db_manager.save_state('last_import_dir', os.path.dirname(file_path))
+            # 在后台线程解析，解析期间禁用导入按钮并显示等待光标
+            self.import_btn.setEnabled(False)
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            self.status_bar.showMessage(f"正在加载题库: {os.path.basename(file_path)}")
+            self.loading_bar.setVisible(True)
+            self._excel_loader = ExcelLoader([file_path], self)
+            self._excel_loader.finished.connect(self.on_questions_imported)
+            self._excel_loader.finished.connect(self._excel_loader.deleteLater)
+            self._excel_loader.start()
+
+    def on_questions_imported(self):
+        """后台解析题库完成"""
+        if self._closing:
+            return
+        file_path, questions, message = self._excel_loader.results[0]
+        self._excel_loader = None
+        QApplication.restoreOverrideCursor()
+        self.loading_bar.setVisible(False)
+        self.import_btn.setEnabled(True)
+        if questions is None:
+            QMessageBox.critical(self, "导入失败", message)
+            return
+
+        # 先保存当前题库进度，再登记新题库（重新导入同名题库时会替换原题库）
+        self.save_current_progress()
+        set_name = self.question_manager.add_question_set(file_path, questions)
+        self.question_manager.set_current_set(set_name)
+
+        # 更新题库选择下拉框（已手动切换题库，不触发 change_question_set）
+        self.set_combo.blockSignals(True)
+        self.set_combo.clear()
+        self.set_combo.addItems(self.question_manager.question_sets.keys())
+        self.set_combo.setCurrentText(set_name)
+        self.set_combo.blockSignals(False)
+
+        # 应用该题库已保存的进度
+        _, _, progress_rows = self.db_manager.load_progress(set_name)
+        if progress_rows:
+            count = self.question_manager.apply_progress(set_name, progress_rows)
+            log.debug("应用进度到导入的题库: %s 条记录", count)
+
+        # 显示第一题（跳过已掌握的题目）
+        self.show_first_unmastered_question()
+        self.update_progress()
+        self.status_bar.showMessage(message)
+
+        # 刷新错题列表
+        self.invalidate_wrong_list()
 
     def export_wrong_questions(self):
         """导出错题为PDF"""
@@ -1732,43 +2225,41 @@ class MainWindow(QMainWindow):
             QMessageBox.information(self, "没有错题", "当前没有错题可导出")
             return
 
+        # 默认保存到上次导出的目录
         file_path, _ = QFileDialog.getSaveFileName(
-            self, "导出错题", "错题集.pdf", "PDF文件 (*.pdf)"
+            self, "导出错题", os.path.join(self.db_manager.load_state('last_export_dir', ""), "错题集.pdf"),
+            "PDF文件 (*.pdf)"
         )
 
         if file_path:
+            self.db_manager.save_state('last_export_dir', os.path.dirname(file_path))
             try:
-                printer = QPrinter(QPrinter.HighResolution)
-                printer.setOutputFormat(QPrinter.PdfFormat)
+                if self._pdf_printer is None:
+                    self._pdf_printer = QPrinter(QPrinter.HighResolution)
+                    self._pdf_printer.setOutputFormat(QPrinter.PdfFormat)
+                    self._pdf_doc = QTextDocument(self)
+                    self._pdf_doc.setDefaultStyleSheet(EXPORT_STYLE)
+                printer = self._pdf_printer
                 printer.setOutputFileName(file_path)
 
-                doc = QTextDocument()
-                html = f"<h1>错题集 - {self.question_manager.current_set}</h1>"
-
+                doc = self._pdf_doc
+                # 各段HTML先放入列表，最后一次拼接（缺失的选项已是空字符串，跳过空白选项）
+                parts = [f"<h1>错题集 - {escape_html(self.question_manager.current_set)}</h1>"]
                 for q in wrong_questions:
-                    html += f"""
-                    <div style="margin-bottom: 20px; border: 1px solid #ccc; padding: 10px; page-break-inside: avoid;">
-                        <p> {q['id']}: {q['content']}</p>
-                        <!-- <p>题型: {q['type']}</p>
-                        <p>选项:</p> -->
-                        <ul>
-                    """
-
-                    for key, text in q['options'].items():
-                        if pd.isna(text) or text.strip() == "":
-                            continue
-                        html += f"<li>{key}. {text}</li>"
-
-                    html += f"""
-                        </ul>
-                        <p><b>正确答案: {q['answer']}</b></p>
-                        <!-- <p>解析: {q['explanation']}</p> 
-                        <p>错误次数: {q['wrong']}</p> -->
-                    </div>
-                    """
-
-                doc.setHtml(html)
-                doc.print_(printer)
+                    options = ''.join(EXPORT_OPTION_HTML.format(key, escape_html(text))
+                                      for key, text in q.options.items() if text.strip())
+                    parts.append(EXPORT_QUESTION_HTML.format(
+                        id=escape_html(q.id), content=escape_html(q.content), answer=escape_html(q.answer),
+                        options=EXPORT_OPTIONS_HTML.format(options) if options else ''))
+                # 排版和写入PDF在界面线程中进行，期间显示等待光标
+                QApplication.setOverrideCursor(Qt.WaitCursor)
+                try:
+                    doc.setHtml(''.join(parts))
+                    doc.print_(printer)
+                finally:
+                    QApplication.restoreOverrideCursor()
+                    # 文档对象会被复用，打印后清空内容，不在两次导出之间占用整份错题集的排版内存
+                    doc.clear()
 
                 self.status_bar.showMessage(f"成功导出 {len(wrong_questions)} 道错题到 {file_path}")
             except Exception as e:
@@ -1777,24 +2268,15 @@ class MainWindow(QMainWindow):
     def release_mastered_questions(self):
         """释放已掌握的题目"""
         # 统计不同错误次数的已掌握题目数量
-        mastered_questions = [q for q in self.question_manager.questions if q['mastered']]
-        
-        if not mastered_questions:
+        error_count_stats = self.question_manager.mastered_wrong_count_stats()
+        if not error_count_stats:
             QMessageBox.information(self, "无已掌握题目", "当前没有已掌握的题目")
             return
-            
-        # 按错误次数统计
-        error_count_stats = {}
-        for q in mastered_questions:
-            wrong_count = q['wrong']
-            error_count_stats[wrong_count] = error_count_stats.get(wrong_count, 0) + 1
-        
+
         # 构建统计信息文本
-        stats_text = "已掌握题目按错误次数分布:\n"
-        for error_count in sorted(error_count_stats.keys()):
-            stats_text += f"错误 {error_count} 次: {error_count_stats[error_count]} 题\n"
-        
-        stats_text += "\n请输入错误次数的阈值:"
+        stats_text = "已掌握题目按错误次数分布:\n" + "".join(
+            f"错误 {error_count} 次: {count} 题\n" for error_count, count in error_count_stats
+        ) + "\n请输入错误次数的阈值:"
 
         # 弹出对话框让用户选择错误次数阈值，并显示统计信息
         threshold, ok = QInputDialog.getInt(
@@ -1808,34 +2290,36 @@ class MainWindow(QMainWindow):
 
         # 释放已掌握题目
         count = self.question_manager.release_mastered_questions_by_wrong_count(threshold)
-
-        # 更新进度
-        self.update_progress()
+        if count:
+            self.schedule_save()
 
         self.status_bar.showMessage(f"已释放 {count} 道错误次数达到 {threshold} 次的题目")
 
         # 刷新错题列表
-        self.refresh_wrong_list()
+        self.invalidate_wrong_list()
 
         # 重新开始新一轮刷题
         self.question_manager.reset_progress(exclude_mastered=True)
+        self.schedule_save()
         self.show_first_unmastered_question()
+        # 释放和重置之后统一更新一次进度
         self.update_progress()
         self.status_bar.showMessage("已重置进度（已掌握题目除外），开始新一轮答题")
 
+    def submit_or_next(self):
+        """未提交时提交答案，已提交时进入下一题（A键和右键的快捷操作）"""
+        if not self.showing_answer:
+            self.submit_answer()
+        else:
+            self.next_question()
+
     def keyPressEvent(self, event):
         """键盘事件处理"""
-        # 只在答题页面处理A键
-        if self.tab_widget.currentIndex() == 0:
-            if event.key() == Qt.Key_A:  # 将空格键改为A键
-                if not self.showing_answer:
-                    # 未提交，执行提交
-                    self.submit_answer()
-                else:
-                    # 已提交，执行下一题
-                    self.next_question()
-                event.accept()  # 确保事件被处理
-                return  # 直接返回，不再传递事件
+        # 只在答题页面处理A键（先判断按键，其他按键不必查询当前页面）
+        if event.key() == Qt.Key_A and self.tab_widget.currentIndex() == 0:  # 将空格键改为A键
+            self.submit_or_next()
+            event.accept()  # 确保事件被处理
+            return  # 直接返回，不再传递事件
 
         # 其他情况调用父类处理
         super().keyPressEvent(event)
@@ -1843,32 +2327,33 @@ class MainWindow(QMainWindow):
     def mousePressEvent(self, event):
         """鼠标事件处理"""
         # 只在答题页面处理右键点击
-        if self.tab_widget.currentIndex() == 0:
-            if event.button() == Qt.MouseButton.RightButton:
-                if not self.showing_answer:
-                    # 未提交，执行提交
-                    self.submit_answer()
-                else:
-                    # 已提交，执行下一题
-                    self.next_question()
-                event.accept()  # 确保事件被处理
-                return  # 直接返回，不再传递事件
+        if event.button() == Qt.MouseButton.RightButton and self.tab_widget.currentIndex() == 0:
+            self.submit_or_next()
+            event.accept()  # 确保事件被处理
+            return  # 直接返回，不再传递事件
 
         # 其他情况调用父类处理
         super().mousePressEvent(event)
 
     def closeEvent(self, event):
         """关闭窗口时保存进度"""
+        # 等待正在进行的题库导入结束，避免线程运行中被销毁；之后才送达的完成信号直接忽略
+        self._closing = True
+        if self._excel_loader is not None:
+            self._excel_loader.wait()
         if self.initialized:
-            print("关闭窗口，保存进度...")
+            log.debug("关闭窗口，保存进度...")
             self.save_current_progress()
-            print("进度保存完成")
         else:
-            print("关闭窗口，跳过保存进度（未初始化）")
+            log.debug("关闭窗口，跳过保存进度（未初始化）")
+        # 等待后台写入完成后关闭数据库
+        self.db_manager.close()
+        log.debug("进度保存完成")
         event.accept()
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s %(message)s")
     try:
         app = QApplication(sys.argv)
         app.setStyle("Fusion")
@@ -1877,5 +2362,4 @@ if __name__ == "__main__":
         window.show()
         sys.exit(app.exec())
     except Exception as e:
-        print(f"程序启动失败: {str(e)}")
-        traceback.print_exc()
\ No newline at end of file
+        log.exception("程序启动失败: %s", e)
\ No newline at end of file